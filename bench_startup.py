@@ -0,0 +1,107 @@
+"""
+Cold-start benchmark voor de geplande run.
+
+Meet met `python -X importtime` hoe lang `import main` duurt (mediaan over een
+paar runs, na één warm-up die de bytecode schrijft) en faalt met exit 1 als:
+- het budget (SURF_IMPORT_BUDGET_MS, default 40 ms) overschreden wordt, of
+- een module die lazy hoort te zijn toch op het importpad belandt. Vergeleken
+  wordt met een kale `python -X importtime -c pass`: wat de interpreter zelf
+  al bij het opstarten laadt (site, .pth-bestanden) telt niet mee.
+
+    python bench_startup.py [runs]
+"""
+import os
+import sys
+import subprocess
+
+BUDGET_MS = float(os.getenv("SURF_IMPORT_BUDGET_MS", "40"))
+
+# Alleen nodig op netwerk-, LLM- of opslagpaden; nooit bij `import main`
+LAZY_MODULES = (
+    "requests",
+    "statistics",
+    "json",
+    "re",
+    "http.client",
+    "urllib.request",
+    "ssl",
+    "email",
+    "sqlite3",
+    "hashlib",
+    "stream_json",
+    "history",
+    "multiprocessing",
+    "parallel",
+    "asyncio",
+    "pipeline",
+    "profiling",
+    "cProfile",
+    "tracemalloc",
+    "coach_local",
+    "random",
+)
+
+
+def measure_once(code="import main"):
+    """
+    Eén verse interpreter; geeft (cumulatieve import-tijd main in us, set geïmporteerde modules).
+    Voor code zonder `import main` is de tijd None.
+    """
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    here = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=here,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{code} faalde:\n{proc.stderr[-2000:]}")
+
+    total_us = None
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line.split("|")
+        if len(parts) < 3 or not parts[1].strip().isdigit():
+            continue  # kopregel
+        name = parts[2].strip()
+        modules.add(name)
+        if name == "main":
+            total_us = int(parts[1].strip())
+    if total_us is None and code == "import main":
+        raise RuntimeError("Geen importtime-regel voor main gevonden.")
+    return total_us, modules
+
+
+def main(runs=5):
+    measure_once()  # warm-up: bytecode schrijven
+    _, baseline = measure_once("pass")
+    samples = []
+    modules = set()
+    for _ in range(runs):
+        us, mods = measure_once()
+        samples.append(us)
+        modules |= mods
+
+    samples.sort()
+    median_ms = samples[len(samples) // 2] / 1000.0
+    print(f"import main: mediaan {median_ms:.1f} ms (min {samples[0] / 1000.0:.1f}, "
+          f"max {samples[-1] / 1000.0:.1f}) over {runs} runs; budget {BUDGET_MS:.0f} ms")
+
+    eager = sorted(m for m in LAZY_MODULES if m in modules - baseline)
+    ok = True
+    if eager:
+        print(f"FOUT: deze modules horen lazy te zijn maar worden bij import geladen: {', '.join(eager)}")
+        ok = False
+    if median_ms > BUDGET_MS:
+        print(f"FOUT: cold start {median_ms:.1f} ms is boven budget {BUDGET_MS:.0f} ms")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5))
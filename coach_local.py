@@ -0,0 +1,405 @@
+"""
+Lokale, deterministische coach: één surfcoach-zin zonder LLM-call.
+
+Een kleine gewogen sjabloongrammatica per taal. Uit de dag (stoplicht, diag,
+dagdelen, period_trend) worden feiten afgeleid; daaruit kiest de coach twee
+onderbouwende signalen (wind, periode, hoogte, trend of beste dagdeel) en een
+opener en afsluiter die bij het stoplicht passen, volgens de toonregels van
+SYSTEM_COACH: groen mag echt enthousiast, oranje genuanceerd (heerlijke
+setjes wel, "heerlijk surfen" nooit), rood helder. Hooguit twee getallen, geen
+tijden. Keuzes zijn geseed op (spot, datum, doel, taal): dezelfde dag geeft
+altijd dezelfde zin, verschillende dagen en spots variëren.
+
+Bedoeld als primaire coach voor bulk fan-out (duizenden spot-dagen per seconde);
+de LLM blijft voor het premium single-spot bericht (zie COACH_MODE in main).
+"""
+import zlib
+import random
+
+import main
+
+GREEN, ORANGE, RED = "🟢", "🟠", "🔴"
+
+# Gewogen alternatieven: (gewicht, tekst) of (gewicht, tekst, vereiste feiten).
+# Signaalteksten hebben een variant met getal en een zonder: (met, zonder).
+# Windrichting ({wt}) en eenheid komen uit main.LOCALES en getallen krijgen altijd
+# een punt, zodat de coachzin dezelfde woorden gebruikt als de rest van het bericht.
+GRAMMAR = {
+    "nl": {
+        "patterns": [
+            (3, "{open}: {a} en {b}."),
+            (2, "{open}, want {a} en {b}."),
+            (2, "{A} en {b}, {close}."),
+        ],
+        "open": {
+            GREEN: [
+                (3, "Pak je board"),
+                (2, "Dit wordt genieten"),
+                (2, "Dit is heerlijk surfen"),
+                (1, "Hier heb je op gewacht"),
+                (1, "Niet twijfelen"),
+            ],
+            ORANGE: [
+                (3, "Prima te doen"),
+                (2, "Er zitten heerlijke setjes tussen"),
+                (2, "Niet perfect, wel bruikbaar"),
+                (1, "Met wat geduld gaat het lukken"),
+                (1, "Er zitten heerlijke momenten tussen", {"not_short"}),
+            ],
+            RED: [
+                (3, "Vooral rommelig"),
+                (2, "Taai werk"),
+                (2, "Eerlijk gezegd matig"),
+                (1, "Weinig lijn te vinden"),
+            ],
+        },
+        "close": {
+            GREEN: [
+                (3, "dus maak er een lange sessie van"),
+                (2, "hier kun je lekker doorpakken"),
+                (2, "dus niet te lang wachten"),
+            ],
+            ORANGE: [
+                (3, "dus kies je moment"),
+                (2, "met geduld pak je er een paar mooie"),
+                (2, "een groter board helpt", {"small"}),
+                (2, "longboard is je beste kans", {"tiny"}),
+            ],
+            RED: [
+                (3, "dus hou het kort"),
+                (2, "een groot board maakt het nog wat waard"),
+                (2, "vooral goed voor wat oefening"),
+                (2, "longboard is je enige kans", {"tiny"}),
+            ],
+        },
+        "size": {
+            "tiny": [(2, ("het is klein ({h} m)", "het is klein")), (1, ("er staat weinig hoogte ({h} m)", "er staat weinig hoogte"))],
+            "small": [(2, ("de golven zijn bescheiden ({h} m)", "de golven zijn bescheiden"))],
+            "medium": [(2, ("er staat een mooie maat ({h} m)", "er staat een mooie maat")), (1, ("de hoogte zit goed ({h} m)", "de hoogte zit goed"))],
+            "big": [(2, ("er staat flink wat hoogte ({h} m)", "er staat flink wat hoogte"))],
+        },
+        "period": {
+            "short": [(2, ("de periode is kort ({t} s)", "de periode is kort")), (1, ("de swell heeft weinig lijn ({t} s)", "de swell heeft weinig lijn"))],
+            "ok": [(2, ("de periode is redelijk ({t} s)", "de periode is redelijk"))],
+            "long": [(2, ("de periode is lang ({t} s)", "de periode is lang")), (1, ("er zit echte power in de swell ({t} s)", "er zit echte power in de swell"))],
+        },
+        "wind": {
+            "offshore_light": [(2, ("de wind staat zacht {wt} ({ws} {unit})", "de wind staat zacht {wt}"))],
+            "offshore_moderate": [(2, ("de wind staat {wt} ({ws} {unit})", "de wind staat {wt}"))],
+            "offshore_strong": [(2, ("de wind staat pittig {wt} ({ws} {unit})", "de wind staat pittig {wt}"))],
+            "sideshore_light": [(2, ("er staat weinig wind, {wt} ({ws} {unit})", "er staat weinig wind, {wt}"))],
+            "sideshore_moderate": [(2, ("de wind staat {wt} ({ws} {unit})", "de wind staat {wt}"))],
+            "sideshore_strong": [(2, ("de wind staat stevig {wt} ({ws} {unit})", "de wind staat stevig {wt}"))],
+            "onshore_light": [(2, ("de wind staat maar zwak {wt} ({ws} {unit})", "de wind staat maar zwak {wt}"))],
+            "onshore_moderate": [(2, ("de wind staat {wt} ({ws} {unit})", "de wind staat {wt}"))],
+            "onshore_strong": [(2, ("de wind staat stevig {wt} ({ws} {unit})", "de wind staat stevig {wt} en drukt het plat"))],
+        },
+        "trend": {
+            "stijgend": [(1, (None, "de periode loopt op door de dag"))],
+            "dalend": [(1, (None, "de periode zakt in de loop van de dag"))],
+        },
+        "daypart": {
+            "Ochtend": [(1, (None, "de ochtend is het beste deel"))],
+            "Middag": [(1, (None, "de middag is het beste deel"))],
+            "Avond": [(1, (None, "de avond is het beste deel"))],
+        },
+    },
+    "en": {
+        "patterns": [
+            (3, "{open}: {a} and {b}."),
+            (2, "{open}, because {a} and {b}."),
+            (2, "{A} and {b}, {close}."),
+        ],
+        "open": {
+            GREEN: [
+                (3, "Grab your board"),
+                (2, "This one is a treat"),
+                (2, "Proper good surf"),
+                (1, "This is what you waited for"),
+            ],
+            ORANGE: [
+                (3, "Perfectly doable"),
+                (2, "There are some lovely sets in between"),
+                (2, "Not perfect, but usable"),
+                (1, "With some patience it works"),
+            ],
+            RED: [
+                (3, "Mostly messy"),
+                (2, "Hard work"),
+                (2, "Honestly pretty poor"),
+                (1, "Not much shape to find"),
+            ],
+        },
+        "close": {
+            GREEN: [
+                (3, "so make it a long session"),
+                (2, "you can really go for it"),
+                (2, "so don't wait too long"),
+            ],
+            ORANGE: [
+                (3, "so pick your moment"),
+                (2, "with patience you'll catch a few good ones"),
+                (2, "a bigger board helps", {"small"}),
+                (2, "a longboard is your best bet", {"tiny"}),
+            ],
+            RED: [
+                (3, "so keep it short"),
+                (2, "a big board still makes it worth something"),
+                (2, "mostly good for some practice"),
+                (2, "a longboard is your only chance", {"tiny"}),
+            ],
+        },
+        "size": {
+            "tiny": [(2, ("it's small ({h} m)", "it's small"))],
+            "small": [(2, ("the waves are modest ({h} m)", "the waves are modest"))],
+            "medium": [(2, ("there's a nice size ({h} m)", "there's a nice size"))],
+            "big": [(2, ("there's plenty of size ({h} m)", "there's plenty of size"))],
+        },
+        "period": {
+            "short": [(2, ("the period is short ({t} s)", "the period is short"))],
+            "ok": [(2, ("the period is decent ({t} s)", "the period is decent"))],
+            "long": [(2, ("the period is long ({t} s)", "the period is long")), (1, ("there's real power in the swell ({t} s)", "there's real power in the swell"))],
+        },
+        "wind": {
+            "offshore_light": [(2, ("the wind is light {wt} ({ws} {unit})", "the wind is light {wt}"))],
+            "offshore_moderate": [(2, ("the wind is {wt} ({ws} {unit})", "the wind is {wt}"))],
+            "offshore_strong": [(2, ("the wind is strong {wt} ({ws} {unit})", "the wind is strong {wt}"))],
+            "sideshore_light": [(2, ("there's little wind, {wt} ({ws} {unit})", "there's little wind, {wt}"))],
+            "sideshore_moderate": [(2, ("the wind is {wt} ({ws} {unit})", "the wind is {wt}"))],
+            "sideshore_strong": [(2, ("the wind is strong {wt} ({ws} {unit})", "the wind is strong {wt}"))],
+            "onshore_light": [(2, ("the wind is only light {wt} ({ws} {unit})", "the wind is only light {wt}"))],
+            "onshore_moderate": [(2, ("the wind is {wt} ({ws} {unit})", "the wind is {wt}"))],
+            "onshore_strong": [(2, ("the wind is strong {wt} ({ws} {unit})", "the wind is strong {wt} and flattens it"))],
+        },
+        "trend": {
+            "stijgend": [(1, (None, "the period builds through the day"))],
+            "dalend": [(1, (None, "the period drops during the day"))],
+        },
+        "daypart": {
+            "Ochtend": [(1, (None, "the morning is the best part"))],
+            "Middag": [(1, (None, "the afternoon is the best part"))],
+            "Avond": [(1, (None, "the evening is the best part"))],
+        },
+    },
+    "de": {
+        "patterns": [
+            (3, "{open}: {a} und {b}."),
+            (2, "{open}, denn {a} und {b}."),
+            (2, "{A} und {b}, {close}."),
+        ],
+        "open": {
+            GREEN: [
+                (3, "Schnapp dir dein Board"),
+                (2, "Das wird ein Genuss"),
+                (2, "Richtig guter Surf"),
+                (1, "Darauf hast du gewartet"),
+            ],
+            ORANGE: [
+                (3, "Gut machbar"),
+                (2, "Es sind schöne Sets dabei"),
+                (2, "Nicht perfekt, aber brauchbar"),
+                (1, "Mit etwas Geduld klappt es"),
+            ],
+            RED: [
+                (3, "Vor allem unruhig"),
+                (2, "Zähe Arbeit"),
+                (2, "Ehrlich gesagt mäßig"),
+                (1, "Wenig Linie zu finden"),
+            ],
+        },
+        "close": {
+            GREEN: [
+                (3, "also mach eine lange Session daraus"),
+                (2, "hier kannst du richtig Gas geben"),
+                (2, "also nicht zu lange warten"),
+            ],
+            ORANGE: [
+                (3, "also wähl deinen Moment"),
+                (2, "mit Geduld erwischst du ein paar gute"),
+                (2, "ein größeres Board hilft", {"small"}),
+                (2, "das Longboard ist deine beste Chance", {"tiny"}),
+            ],
+            RED: [
+                (3, "also halte es kurz"),
+                (2, "mit einem großen Board lohnt es sich noch etwas"),
+                (2, "vor allem gut zum Üben"),
+                (2, "das Longboard ist deine einzige Chance", {"tiny"}),
+            ],
+        },
+        "size": {
+            "tiny": [(2, ("es ist klein ({h} m)", "es ist klein"))],
+            "small": [(2, ("die Wellen sind bescheiden ({h} m)", "die Wellen sind bescheiden"))],
+            "medium": [(2, ("die Größe passt ({h} m)", "die Größe passt"))],
+            "big": [(2, ("es steht ordentlich Höhe ({h} m)", "es steht ordentlich Höhe"))],
+        },
+        "period": {
+            "short": [(2, ("die Periode ist kurz ({t} s)", "die Periode ist kurz"))],
+            "ok": [(2, ("die Periode ist ordentlich ({t} s)", "die Periode ist ordentlich"))],
+            "long": [(2, ("die Periode ist lang ({t} s)", "die Periode ist lang"))],
+        },
+        "wind": {
+            "offshore_light": [(2, ("der Wind weht leicht {wt} ({ws} {unit})", "der Wind weht leicht {wt}"))],
+            "offshore_moderate": [(2, ("der Wind weht {wt} ({ws} {unit})", "der Wind weht {wt}"))],
+            "offshore_strong": [(2, ("der Wind weht kräftig {wt} ({ws} {unit})", "der Wind weht kräftig {wt}"))],
+            "sideshore_light": [(2, ("es weht wenig Wind, {wt} ({ws} {unit})", "es weht wenig Wind, {wt}"))],
+            "sideshore_moderate": [(2, ("der Wind weht {wt} ({ws} {unit})", "der Wind weht {wt}"))],
+            "sideshore_strong": [(2, ("der Wind weht kräftig {wt} ({ws} {unit})", "der Wind weht kräftig {wt}"))],
+            "onshore_light": [(2, ("der Wind weht nur schwach {wt} ({ws} {unit})", "der Wind weht nur schwach {wt}"))],
+            "onshore_moderate": [(2, ("der Wind weht {wt} ({ws} {unit})", "der Wind weht {wt}"))],
+            "onshore_strong": [(2, ("der Wind weht kräftig {wt} ({ws} {unit})", "der Wind weht kräftig {wt} und drückt es platt"))],
+        },
+        "trend": {
+            "stijgend": [(1, (None, "die Periode nimmt im Laufe des Tages zu"))],
+            "dalend": [(1, (None, "die Periode nimmt im Laufe des Tages ab"))],
+        },
+        "daypart": {
+            "Ochtend": [(1, (None, "der Vormittag ist der beste Teil"))],
+            "Middag": [(1, (None, "der Nachmittag ist der beste Teil"))],
+            "Avond": [(1, (None, "der Abend ist der beste Teil"))],
+        },
+    },
+}
+
+_COLOR_RANK = {GREEN: 2, ORANGE: 1, RED: 0}
+
+
+# =======================
+# Feiten uit de dag
+# =======================
+def _size_bucket(h):
+    if h < 0.45:
+        return "tiny"
+    if h < 0.8:
+        return "small"
+    if h < 1.3:
+        return "medium"
+    return "big"
+
+
+def _period_bucket(t):
+    if main.period_is_short(t):
+        return "short"
+    if t < 8.0:
+        return "ok"
+    return "long"
+
+
+def _best_daypart(day):
+    """
+    Naam van het enige dagdeel met de beste kleur, of None als dat niet eenduidig is.
+    """
+    parts = day.get("dayparts") or {}
+    if len(parts) < 2:
+        return None
+    best = max(_COLOR_RANK.get(p["color"], 0) for p in parts.values())
+    names = [n for n, p in parts.items() if _COLOR_RANK.get(p["color"], 0) == best]
+    return names[0] if len(names) == 1 else None
+
+
+def day_facts(day, purpose="today"):
+    """
+    (signalen: naam -> (bucket, gewicht), feiten-set) voor één dag.
+    Het gewicht is hoe doorslaggevend het signaal voor deze dag is.
+    """
+    diag = day.get("diag") or {}
+    size = _size_bucket(day["avg_wave"])
+    period = _period_bucket(day.get("rep_per", day["avg_per"]))
+    wt = day.get("wind_type", "sideshore")
+    wind = day["avg_wind"]
+    strength = "light" if wind < 12 else ("moderate" if wind < 22 else "strong")
+
+    signals = {
+        "wind": (f"{wt}_{strength}", {"onshore_strong": 3.0, "offshore_light": 2.5, "offshore_moderate": 2.2,
+                                      "offshore_strong": 2.0, "onshore_moderate": 2.0,
+                                      "onshore_light": 1.5}.get(f"{wt}_{strength}", 1.2)),
+        "period": (period, {"short": 3.0, "long": 2.5}.get(period, 1.2)),
+        "size": (size, {"tiny": 3.0, "big": 2.0, "small": 1.5}.get(size, 1.0)),
+    }
+    trend = diag.get("period_trend")
+    if trend in ("stijgend", "dalend"):
+        signals["trend"] = (trend, 1.2)
+    if purpose == "today":
+        part = _best_daypart(day)
+        if part:
+            signals["daypart"] = (part, 1.8)
+
+    facts = {size, period, wt, strength, purpose}
+    if period != "short":
+        facts.add("not_short")
+    return signals, facts
+
+
+# =======================
+# Genereren
+# =======================
+def _pick(rng, options, facts):
+    allowed = [o for o in options if len(o) < 3 or o[2] <= facts]
+    return rng.choices([o[1] for o in allowed], weights=[o[0] for o in allowed])[0]
+
+
+def _num(value, ndigits):
+    # altijd een punt, net als fmt_range en future_line in main
+    return f"{value:.{ndigits}f}"
+
+
+def _seed(day, purpose, locale):
+    diag = day.get("diag") or {}
+    key = f"{diag.get('spot', main.SPOT['name'])}|{day['date']}|{purpose}|{locale}|{day.get('color')}"
+    return zlib.crc32(key.encode("utf-8"))
+
+
+def compose(day, purpose="today", locale=main.DEFAULT_LOCALE):
+    """
+    Eén zin volgens de grammatica, zonder controle achteraf.
+    """
+    G = GRAMMAR.get(locale) or GRAMMAR[main.DEFAULT_LOCALE]
+    rng = random.Random(_seed(day, purpose, locale))
+    color = day.get("color") if day.get("color") in G["open"] else RED
+    signals, facts = day_facts(day, purpose)
+
+    # twee verschillende signalen, gewogen naar hoe doorslaggevend ze zijn;
+    # periode en periodetrend zeggen hetzelfde, dus nooit samen
+    names = list(signals)
+    first = rng.choices(names, weights=[signals[n][1] for n in names])[0]
+    names = [n for n in names if n != first and {n, first} != {"period", "trend"}]
+    second = rng.choices(names, weights=[signals[n][1] for n in names])[0]
+
+    L = main.locale_texts(locale)
+    wt = day.get("wind_type", "sideshore")
+    values = {
+        "h": _num(day["avg_wave"], 1),
+        "t": _num(day.get("rep_per", day["avg_per"]), 0),
+        "ws": _num(day["avg_wind"], 0),
+        "unit": L["speed_unit"],
+        "wt": L["wind_types"].get(wt, wt),
+    }
+    clauses = []
+    numbers = 0
+    for name in (first, second):
+        with_num, plain = _pick(rng, G[name][signals[name][0]], facts)
+        # hooguit twee getallen per zin; soms bewust zonder
+        if with_num and numbers < 2 and rng.random() < 0.6:
+            clauses.append(with_num.format(**values))
+            numbers += 1
+        else:
+            clauses.append(plain.format(**values))
+
+    pattern = _pick(rng, G["patterns"], facts)
+    text = pattern.format(
+        open=_pick(rng, G["open"][color], facts),
+        close=_pick(rng, G["close"][color], facts),
+        a=clauses[0],
+        A=clauses[0][:1].upper() + clauses[0][1:],
+        b=clauses[1],
+    )
+    return text
+
+
+def coach(day, purpose="today", locale=main.DEFAULT_LOCALE):
+    """
+    Coachzin die dezelfde controles passeert als de LLM-output; anders de vaste fallback.
+    """
+    text = main._sanitize_coach(compose(day, purpose, locale), locale)
+    if not text or (day.get("color") != GREEN and main._contains_hype(text, locale)):
+        return main.fallback_coach(day, locale)
+    return text
@@ -0,0 +1,250 @@
+"""
+Lokale geschiedenis van forecasts en samenvattingen (SQLite).
+
+Per spot en run-tijd worden de ruwe uurinputs en de dag/dagdeel-samenvattingen
+bewaard, met batched inserts en indexen op (spot, date, run_time). Zo kun je
+zonder opnieuw downloaden of analyseren vragen hoe de forecast voor zaterdag
+over de laatste runs veranderde, of hoeveel groene dagen er per maand waren.
+"""
+import os
+import sys
+import json
+import math
+import sqlite3
+
+CACHE_DIR = os.getenv("SURF_CACHE_DIR", ".surfalert")
+DB_PATH = os.getenv("SURF_HISTORY_DB", os.path.join(CACHE_DIR, "history.sqlite"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hourly_inputs (
+    spot TEXT NOT NULL,
+    run_time TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    date TEXT NOT NULL,
+    wave_height REAL,
+    swell_period REAL,
+    wave_period REAL,
+    peak_period REAL,
+    wind_kmh REAL,
+    wind_dir REAL,
+    PRIMARY KEY (spot, run_time, ts)
+);
+CREATE INDEX IF NOT EXISTS idx_hourly_spot_date_run ON hourly_inputs (spot, date, run_time);
+
+CREATE TABLE IF NOT EXISTS day_summaries (
+    spot TEXT NOT NULL,
+    date TEXT NOT NULL,
+    run_time TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    color TEXT,
+    day_score REAL,
+    threshold REAL,
+    avg_wave REAL,
+    avg_per REAL,
+    rep_per REAL,
+    avg_wind REAL,
+    wind_type TEXT,
+    energy REAL,
+    clusters TEXT,
+    PRIMARY KEY (spot, date, run_time, profile)
+);
+CREATE INDEX IF NOT EXISTS idx_day_spot_date_run ON day_summaries (spot, date, run_time);
+
+CREATE TABLE IF NOT EXISTS daypart_summaries (
+    spot TEXT NOT NULL,
+    date TEXT NOT NULL,
+    run_time TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    daypart TEXT NOT NULL,
+    color TEXT,
+    h_min REAL,
+    h_max REAL,
+    t_min REAL,
+    t_max REAL,
+    t_rep REAL,
+    wind_avg REAL,
+    wind_type TEXT,
+    PRIMARY KEY (spot, date, run_time, profile, daypart)
+);
+CREATE INDEX IF NOT EXISTS idx_daypart_spot_date_run ON daypart_summaries (spot, date, run_time);
+"""
+
+
+def connect(path=None):
+    path = path or DB_PATH
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _num(arr, i):
+    """
+    Waarde i uit een Open-Meteo array; None bij ontbrekend, te kort of NaN.
+    """
+    if i >= len(arr):
+        return None
+    v = arr[i]
+    if v is None or (isinstance(v, float) and math.isnan(v)):
+        return None
+    return v
+
+
+# =======================
+# Schrijven
+# =======================
+def record_run(conn, spot, run_time, marine, wind, summary):
+    """
+    Bewaar één run: ruwe uurinputs + samenvattingen voor alle geanalyseerde profielen.
+    Alles in één transactie met executemany.
+    """
+    mh = marine.get("hourly", {})
+    wh = wind.get("hourly", {})
+    hrs = mh.get("time", [])
+    cols = [
+        mh.get("wave_height", []),
+        mh.get("swell_wave_period", []),
+        mh.get("wave_period", []),
+        mh.get("swell_wave_peak_period", []),
+        wh.get("windspeed_10m", []),
+        wh.get("winddirection_10m", []),
+    ]
+    hourly_rows = (
+        (spot, run_time, ts, ts[:10], *(_num(c, i) for c in cols))
+        for i, ts in enumerate(hrs)
+    )
+
+    day_rows = []
+    part_rows = []
+    for day in summary:
+        date = str(day["date"])
+        profiles = day.get("profiles") or {}
+        for name, res in profiles.items():
+            day_rows.append((
+                spot, date, run_time, name, res["color"], res["day_score"], res["threshold"],
+                day["avg_wave"], day["avg_per"], day["rep_per"], day["avg_wind"], day["wind_type"],
+                day["energy"], json.dumps(res["clusters"]),
+            ))
+            for part_name, part in (day.get("dayparts") or {}).items():
+                part_rows.append((
+                    spot, date, run_time, name, part_name,
+                    res["daypart_colors"].get(part_name, part["color"]),
+                    part["h_min"], part["h_max"], part["t_min"], part["t_max"], part["t_rep"],
+                    part["wind_avg"], part["wind_type"],
+                ))
+
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO hourly_inputs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", hourly_rows
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO day_summaries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", day_rows
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO daypart_summaries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", part_rows
+        )
+
+
+# =======================
+# Queries
+# =======================
+def forecast_evolution(conn, spot, date, last_n=5, profile="standaard"):
+    """
+    Hoe de forecast voor één datum veranderde over de laatste N runs (oud -> nieuw).
+    """
+    rows = conn.execute(
+        """
+        SELECT run_time, color, day_score, avg_wave, avg_per, avg_wind, wind_type
+        FROM day_summaries
+        WHERE spot = ? AND date = ? AND profile = ?
+        ORDER BY run_time DESC
+        LIMIT ?
+        """,
+        (spot, str(date), profile, last_n),
+    ).fetchall()
+    return [dict(r) for r in reversed(rows)]
+
+
+def daypart_evolution(conn, spot, date, last_n=5, profile="standaard"):
+    rows = conn.execute(
+        """
+        SELECT run_time, daypart, color, h_min, h_max, t_rep, wind_avg, wind_type
+        FROM daypart_summaries
+        WHERE spot = ? AND date = ? AND profile = ?
+          AND run_time IN (
+              SELECT DISTINCT run_time FROM day_summaries
+              WHERE spot = ? AND date = ? AND profile = ?
+              ORDER BY run_time DESC LIMIT ?
+          )
+        ORDER BY run_time, daypart
+        """,
+        (spot, str(date), profile, spot, str(date), profile, last_n),
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def color_days_per_month(conn, spot, color="🟢", profile="standaard"):
+    """
+    Aantal dagen met deze kleur per maand; per datum telt alleen de laatste run.
+    """
+    rows = conn.execute(
+        """
+        WITH latest AS (
+            SELECT date, MAX(run_time) AS run_time
+            FROM day_summaries
+            WHERE spot = ? AND profile = ?
+            GROUP BY date
+        )
+        SELECT substr(d.date, 1, 7) AS month, COUNT(*) AS days
+        FROM day_summaries d
+        JOIN latest l ON d.date = l.date AND d.run_time = l.run_time
+        WHERE d.spot = ? AND d.profile = ? AND d.color = ?
+        GROUP BY month
+        ORDER BY month
+        """,
+        (spot, profile, spot, profile, color),
+    ).fetchall()
+    return {r["month"]: r["days"] for r in rows}
+
+
+def hourly_inputs(conn, spot, date, run_time=None):
+    """
+    Ruwe uurinputs van één datum, standaard uit de laatste run die deze datum had.
+    """
+    if run_time is None:
+        row = conn.execute(
+            "SELECT MAX(run_time) AS rt FROM hourly_inputs WHERE spot = ? AND date = ?",
+            (spot, str(date)),
+        ).fetchone()
+        run_time = row["rt"] if row else None
+        if run_time is None:
+            return []
+    rows = conn.execute(
+        "SELECT * FROM hourly_inputs WHERE spot = ? AND date = ? AND run_time = ? ORDER BY ts",
+        (spot, str(date), run_time),
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+if __name__ == "__main__":
+    # python history.py verloop 2026-10-24 [n] [spot]
+    # python history.py groen [spot]
+    spot_default = "Scheveningen Pier"
+    args = sys.argv[1:]
+    conn = connect()
+    if args[:1] == ["verloop"] and len(args) >= 2:
+        n = int(args[2]) if len(args) > 2 else 5
+        spot = args[3] if len(args) > 3 else spot_default
+        for r in forecast_evolution(conn, spot, args[1], last_n=n):
+            print(f"{r['run_time']}  {r['color']}  {r['avg_wave']:.1f} m  {r['avg_per']:.0f} s  "
+                  f"{r['avg_wind']:.0f} km/u {r['wind_type']}  (score {r['day_score']:.2f})")
+    elif args[:1] == ["groen"]:
+        spot = args[1] if len(args) > 1 else spot_default
+        for month, days in color_days_per_month(conn, spot).items():
+            print(f"{month}: {days} groene dagen")
+    else:
+        print("Gebruik: python history.py verloop <datum> [n] [spot] | python history.py groen [spot]")
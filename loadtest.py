@@ -0,0 +1,348 @@
+"""
+Loadtest van de volledige flow tegen lokale stand-ins voor de externe API's.
+
+Een apart proces speelt Open-Meteo (marine + forecast), Groq en de Telegram Bot
+API na op 127.0.0.1, elk op een eigen poort (dus een eigen host en eigen
+breaker-state in main), met instelbare latency. Dit proces draait de
+productiepaden van main:
+- ronde 1 (ochtendbericht), per spot: analyse (fetch_forecast, history) ->
+  render_for_subscribers (render-cache) -> fan_out, daarna remember_sent;
+- elke volgende ronde: run_refresh (skeleton-hashes, editMessageText). Per ronde
+  verandert de forecast van --change-pct procent van de spots.
+Rapport: doorvoer, p50/p95/p99 end-to-end latency per ochtendbericht (start
+fetch -> bericht verstuurd), duur en edits per refresh en piekgeheugen.
+
+    python loadtest.py --spots 200 --subscribers 20000 --rounds 3 --concurrency 16
+"""
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import tempfile
+import threading
+import datetime as dt
+
+# =======================
+# Stand-in server (eigen proces)
+# =======================
+def _version(lat, lon, rnd, change_pct):
+    """
+    Hoe vaak de forecast van deze locatie tot en met refresh-ronde rnd veranderd is.
+    """
+    return sum(1 for r in range(1, rnd + 1) if (int(lat * 1000) * 31 + int(lon * 1000) * 17 + r * 7919) % 100 < change_pct)
+
+
+def _series(field, lat, lon, count, version=0):
+    """
+    Deterministische, realistisch ogende uurwaarden per locatie; version schuift de golfhoogte op.
+    """
+    seed = (lat * 7.3 + lon * 3.1) % 6.283
+    if field == "wave_height":
+        return [round(max(0.1, 0.9 + 0.3 * version + 0.5 * math.sin(i / 9.0 + seed)), 2) for i in range(count)]
+    if field == "windspeed_10m":
+        return [round(abs(18 + 12 * math.sin(i / 7.0 + seed)), 1) for i in range(count)]
+    if field == "winddirection_10m":
+        return [round((90 + 5 * i + 40 * seed) % 360) for i in range(count)]
+    return [round(7.0 + 1.5 * math.sin(i / 13.0 + seed), 1) for i in range(count)]
+
+
+def _open_meteo_body(query, rnd=0, change_pct=0):
+    from urllib.parse import parse_qs
+
+    q = {k: v[0] for k, v in parse_qs(query).items()}
+    lats = [float(x) for x in q.get("latitude", "0").split(",")]
+    lons = [float(x) for x in q.get("longitude", "0").split(",")]
+    fields = q.get("hourly", "").split(",")
+    start = dt.datetime.combine(dt.date.today(), dt.time())
+    if "start_hour" in q and "end_hour" in q:
+        # delta-requests: alleen [start_hour, end_hour], met dezelfde waarden als het volle rooster
+        first = int((dt.datetime.fromisoformat(q["start_hour"]) - start).total_seconds() // 3600)
+        last = int((dt.datetime.fromisoformat(q["end_hour"]) - start).total_seconds() // 3600)
+    else:
+        first, last = 0, 24 * int(q.get("forecast_days", "3")) - 1
+    count = last + 1
+    times = [(start + dt.timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M") for i in range(first, count)]
+
+    docs = []
+    for lat, lon in zip(lats, lons):
+        hourly = {"time": times}
+        for f in fields:
+            hourly[f] = _series(f, lat, lon, count, _version(lat, lon, rnd, change_pct))[first:]
+        docs.append({"latitude": lat, "longitude": lon, "timezone": q.get("timezone"), "hourly": hourly})
+    return json.dumps(docs if len(docs) > 1 else docs[0]).encode()
+
+
+def _serve(port_queue, latency_ms, rnd, change_pct):
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    cache = {}
+    lock = threading.Lock()
+    message_ids = iter(range(1, 1 << 62))
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, body, delay_ms):
+            if delay_ms:
+                time.sleep(delay_ms / 1000.0)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path, _, query = self.path.partition("?")
+            key = (self.path, rnd.value)
+            with lock:
+                body = cache.get(key)
+            if body is None:
+                body = _open_meteo_body(query, rnd.value, change_pct)
+                with lock:
+                    cache[key] = body
+            self._reply(body, latency_ms["open_meteo"])
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            self.rfile.read(length)
+            if self.path.startswith("/groq"):
+                text = "Stand-in coach: netjes setje, let op de wind en pak je moment."
+                body = json.dumps({"choices": [{"message": {"content": text}}]}).encode()
+                self._reply(body, latency_ms["groq"])
+            else:
+                with lock:
+                    mid = next(message_ids)
+                body = json.dumps({"ok": True, "result": {"message_id": mid}}).encode()
+                self._reply(body, latency_ms["telegram"])
+
+    # één server per API: eigen poort = eigen host-sleutel voor de breaker in main
+    ports = {}
+    for name in ("open_meteo", "groq", "telegram"):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        ports[name] = server.server_address[1]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    port_queue.put(ports)
+    threading.Event().wait()
+
+
+def start_stand_ins(latency_ms, change_pct=50):
+    """
+    Start de stand-in servers in een eigen proces; geeft (proces, {api: base-url}, ronde-teller).
+    """
+    import multiprocessing
+
+    ctx = multiprocessing.get_context()
+    port_queue = ctx.Queue()
+    rnd = ctx.Value("i", 0)
+    proc = ctx.Process(target=_serve, args=(port_queue, latency_ms, rnd, change_pct), daemon=True)
+    proc.start()
+    ports = port_queue.get(timeout=10)
+    return proc, {name: f"http://127.0.0.1:{port}" for name, port in ports.items()}, rnd
+
+
+def point_main_at(main, urls, coach, subscribers):
+    """
+    Alle externe endpoints van main naar de stand-ins; state (breaker, sent, history) in een tempdir.
+    """
+    import history
+
+    tmp = tempfile.mkdtemp(prefix="surf-loadtest-")
+    main.MARINE_URL = f"{urls['open_meteo']}/v1/marine"
+    main.FORECAST_URL = f"{urls['open_meteo']}/v1/forecast"
+    main.GROQ_URL = f"{urls['groq']}/groq"
+    main.TELEGRAM_API = urls["telegram"]
+    main.TELEGRAM_TOKEN = "loadtest"
+    main.GROQ_API_KEY = "loadtest" if coach == "llm" else None
+    main.COACH_MODE = coach
+    main.CACHE_DIR = tmp
+    main.SENT_STATE_FILE = os.path.join(tmp, "sent.json")
+    main.HOST_STATE_FILE = os.path.join(tmp, "hosts.json")
+    main._HOST_STATE = None
+    history.DB_PATH = os.path.join(tmp, "history.sqlite")
+    main.load_subscribers = lambda path=None: subscribers
+
+
+# =======================
+# Driver
+# =======================
+def make_spots(n):
+    # raster langs de Noordzeekust; alleen de eerste spot heeft getij
+    return [
+        {"name": f"spot-{i}", "lat": round(51.3 + 2.2 * i / max(n, 1), 3), "lon": round(3.4 + 1.6 * (i % 7) / 7, 3),
+         "tide": "scheveningen" if i == 0 else None}
+        for i in range(n)
+    ]
+
+
+def make_subscribers(spot_list, n):
+    # round-robin over de spots, met een mix van profielen en talen
+    profiles = ("standaard", "standaard", "longboard")
+    locales = ("nl", "nl", "en", "de")
+    return [
+        {"chat_id": 100000 + i, "spot": spot_list[i % len(spot_list)],
+         "profile": profiles[i % len(profiles)], "locale": locales[i % len(locales)]}
+        for i in range(n)
+    ]
+
+
+def run_spot(main, spot, subs):
+    """
+    Ochtendbericht voor één spot zoals run_daily het doet. Geeft (abonnees, berichten,
+    skeletons, message_ids, latency (s) per verstuurd bericht).
+    """
+    t0 = time.perf_counter()
+    latencies = []
+
+    def timed_send(message, chat_id=None):
+        mid = main.send_telegram_message(message, chat_id=chat_id)
+        latencies.append(time.perf_counter() - t0)
+        return mid
+
+    try:
+        summary, sub_profiles = main.analyse(subs, spot)
+        messages = main.render_for_subscribers(summary, subs, sub_profiles)
+        skeletons = [
+            main.render_skeleton(summary, profile, sub.get("locale", main.DEFAULT_LOCALE))
+            for sub, profile in zip(subs, sub_profiles)
+        ]
+    except Exception as e:
+        err = str(e)[:220]
+        messages = [main.locale_texts(sub.get("locale"))["fetch_error"].format(err=err) for sub in subs]
+        skeletons = [None] * len(subs)
+    ids = main.fan_out(subs, messages, send=timed_send)
+    return subs, messages, skeletons, ids, latencies
+
+
+def percentile(sorted_values, q):
+    """
+    Nearest-rank percentiel op een gesorteerde lijst.
+    """
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # geen Unix
+        return float("nan")
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return kb / 1024.0 if sys.platform != "darwin" else kb / (1024.0 * 1024.0)
+
+
+def run(spots=50, subscribers=5000, rounds=1, concurrency=8, coach="local", latency_ms=None, change_pct=50):
+    from concurrent.futures import ThreadPoolExecutor
+
+    import main
+
+    latency_ms = latency_ms or {"open_meteo": 30, "groq": 400, "telegram": 5}
+    proc, urls, rnd = start_stand_ins(latency_ms, change_pct)
+    try:
+        spot_list = make_spots(spots)
+        subs = make_subscribers(spot_list, subscribers)
+        point_main_at(main, urls, coach, subs)
+
+        # ronde 1: ochtendbericht, spots parallel
+        latencies = []
+        sent = ([], [], [], [])
+        t_start = time.perf_counter()
+        main.clear_render_cache()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [pool.submit(run_spot, main, spot, group) for spot, group in main.group_by_spot(subs)]
+            for fut in futures:
+                *cols, lat = fut.result()
+                for col, values in zip(sent, cols):
+                    col.extend(values)
+                latencies.extend(lat)
+        daily_s = time.perf_counter() - t_start
+        main.remember_sent(*sent)
+
+        # volgende rondes: uurlijkse refresh
+        refresh_s = []
+        edits = 0
+        for r in range(1, rounds):
+            rnd.value = r
+            t0 = time.perf_counter()
+            edits += main.run_refresh()
+            refresh_s.append(time.perf_counter() - t0)
+    finally:
+        proc.terminate()
+        proc.join(timeout=5)
+
+    latencies.sort()
+    errors = sent[3].count(None)
+    report = {
+        "spots": spots,
+        "subscribers": subscribers,
+        "rounds": rounds,
+        "concurrency": concurrency,
+        "messages": len(latencies),
+        "errors": errors,
+        "elapsed_s": daily_s,
+        "messages_per_s": len(latencies) / daily_s if daily_s else float("nan"),
+        "spots_per_s": spots / daily_s if daily_s else float("nan"),
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "p99_s": percentile(latencies, 99),
+        "refreshes": len(refresh_s),
+        "refresh_mean_s": sum(refresh_s) / len(refresh_s) if refresh_s else float("nan"),
+        "refresh_max_s": max(refresh_s, default=float("nan")),
+        "edits": edits,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    return report
+
+
+def print_report(rep):
+    print(f"{rep['spots']} spots, {rep['rounds']} ronde(s), {rep['subscribers']} abonnees, "
+          f"concurrency {rep['concurrency']}")
+    print(f"  berichten: {rep['messages']} verstuurd, {rep['errors']} fouten in {rep['elapsed_s']:.1f} s")
+    print(f"  doorvoer:  {rep['messages_per_s']:.0f} berichten/s, {rep['spots_per_s']:.1f} spots/s")
+    print(f"  latency:   p50 {rep['p50_s'] * 1000:.0f} ms, p95 {rep['p95_s'] * 1000:.0f} ms, "
+          f"p99 {rep['p99_s'] * 1000:.0f} ms")
+    if rep["refreshes"]:
+        print(f"  refresh:   {rep['refreshes']}x, gemiddeld {rep['refresh_mean_s']:.1f} s, "
+              f"max {rep['refresh_max_s']:.1f} s, {rep['edits']} edits")
+    print(f"  piekgeheugen: {rep['peak_rss_mb']:.0f} MB (RSS)")
+
+
+def _args(argv):
+    p = argparse.ArgumentParser(description="Loadtest van de surf-alert flow tegen lokale stand-ins.")
+    p.add_argument("--spots", type=int, default=50)
+    p.add_argument("--subscribers", type=int, default=5000)
+    p.add_argument("--rounds", type=int, default=1,
+                   help="1 = alleen het ochtendbericht; elke volgende ronde is een run_refresh")
+    p.add_argument("--change-pct", type=int, default=50, help="%% spots waarvan de forecast per refresh verandert")
+    p.add_argument("--concurrency", type=int, default=8, help="spots tegelijk in de lucht")
+    p.add_argument("--coach", choices=("local", "llm"), default="local",
+                   help="local = coach_local.py, llm = elke coachzin via de Groq stand-in")
+    p.add_argument("--open-meteo-ms", type=int, default=30)
+    p.add_argument("--groq-ms", type=int, default=400)
+    p.add_argument("--telegram-ms", type=int, default=5)
+    p.add_argument("--json", action="store_true", help="rapport als JSON")
+    return p.parse_args(argv)
+
+
+if __name__ == "__main__":
+    a = _args(sys.argv[1:])
+    rep = run(
+        spots=a.spots,
+        subscribers=a.subscribers,
+        rounds=a.rounds,
+        concurrency=a.concurrency,
+        change_pct=a.change_pct,
+        coach=a.coach,
+        latency_ms={"open_meteo": a.open_meteo_ms, "groq": a.groq_ms, "telegram": a.telegram_ms},
+    )
+    if a.json:
+        print(json.dumps(rep, indent=2))
+    else:
+        print_report(rep)
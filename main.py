@@ -1,12 +1,15 @@
 import os
-import json
-import re
+import sys
 import math
 import time
-import http.client
+import _thread
 import datetime as dt
-import statistics as stats
-import requests
+
+import tide
+
+# Zware of netwerk-only modules (requests, json, re, urllib, sqlite3, ...) worden pas
+# geïmporteerd in de functie die ze nodig heeft: een korte geplande run besteedt zijn
+# tijd dan aan werk, niet aan interpreter- en import-setup. Zie bench_startup.py.
 
 # =======================
 # Config
@@ -14,15 +17,158 @@ import requests
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+SUBSCRIBERS_FILE = os.getenv("SURF_SUBSCRIBERS", "subscribers.json")
 
 MODEL_ID = "openai/gpt-oss-120b"
 
-SPOT = {"name": "Scheveningen Pier", "lat": 52.109, "lon": 4.276}
+# Coach: "llm" (Groq, vaste zinnen als fallback), "local" (coach_local.py, geen netwerk)
+# of "auto": LLM voor het premium bericht van SPOT, lokaal voor alle andere spots (bulk).
+COACH_MODE = os.getenv("SURF_COACH", "auto")
+
+SPOT = {"name": "Scheveningen Pier", "lat": 52.109, "lon": 4.276, "tide": "scheveningen"}
 TZ = "Europe/Amsterdam"
 
 DAGEN = ["Maandag", "Dinsdag", "Woensdag", "Donderdag", "Vrijdag", "Zaterdag", "Zondag"]
 MAANDEN = ["jan", "feb", "mrt", "apr", "mei", "jun", "jul", "aug", "sep", "okt", "nov", "dec"]
 
+# Berichtteksten per taal. Dagdeel-sleutels blijven de Nederlandse namen uit DAYPARTS_DEF.
+LOCALES = {
+    "nl": {
+        "days": DAGEN,
+        "months": MAANDEN,
+        "dayparts": {"Ochtend": "Ochtend", "Middag": "Middag", "Avond": "Avond"},
+        "speed_unit": "km/u",
+        "no_window": "geen duidelijk venster",
+        "all_day": "vrijwel de hele dag",
+        "all_day_dips": "door de dag heen (met dips)",
+        "spike_around": "kort piekje rond {h0:02d}–{h1:02d}u",
+        "big_part": "groot deel van de dag, vooral {h0:02d}–{h1:02d}u",
+        "mostly": "vooral {h0:02d}–{h1:02d}u",
+        "best_short_period": "👉 Beste moment: geen echt venster (te korte periode, vooral rommel)",
+        "best_all_day_green": "👉 Beste momenten: de hele dag vrij consistent (08–20u)",
+        "best_all_day": "👉 Beste momenten: door de dag heen, met duidelijk betere stukken",
+        "best_spike": "👉 Beste moment: kort piekje {h0:02d}–{h1:02d}u",
+        "best_big_part": "👉 Beste momenten: groot deel van de dag ({h0:02d}–{h1:02d}u)",
+        "best_one": "👉 Beste moment: {h0:02d}–{h1:02d}u",
+        "best_none_today": "👉 Beste moment: geen duidelijk venster vandaag",
+        "sessions_title": "🏄 Beste sessies komende {days} dagen:",
+        "date_label": "{day} {d} {month}",
+        "session_line": "{square} {date} {h0:02d}–{h1:02d}u (score {score:.1f})",
+        "sessions_none": "Geen bruikbare sessies in deze periode.",
+        "tomorrow": "Morgen",
+        "day_after": "Overmorgen",
+        "future_line": "Venster: {phrase}, met ~{wave:.1f} m en {period} s swell.",
+        "why": {"much_wind": "veel wind", "little_wind": "weinig wind", "short_period": "korte periode", "long_period": "lange periode"},
+        "wind_types": {"onshore": "onshore", "offshore": "offshore", "sideshore": "sideshore"},
+        "no_data": "Geen surfdata beschikbaar vandaag.",
+        "fetch_error": "Surfbot: Open-Meteo tijdelijk traag/onbereikbaar. ({err})",
+        "coach": {
+            "short_onshore": "Korte periode en veel onshore, dus vooral chop en weinig lijn.",
+            "short": "Korte periode, dus snel rommelig en weinig echte power.",
+            "tiny": "Klein en weinig power, longboard is je beste kans.",
+            "small_short": "Klein en kort, longboard of funboard werkt het lekkerst.",
+            "onshore_flat": "Hoogte zat, maar de wind drukt het snel plat; vooral werken voor je golven.",
+            "offshore_good": "Wind helpt mee en de periode geeft ruimte, hier kun je lekker doorpakken.",
+            "mixed": "Met wat geduld zitten er best bruikbare setjes tussen, al blijft het wisselend.",
+        },
+        "ai_language": None,
+        # tijden en hype die de coachzin niet mag bevatten (lowercase regexes)
+        "coach_guard": {"times": [r"\b\d{1,2}\s*(u|uur)\b"], "hype": [r"\bheerlij\w*\s+surfen\b"]},
+    },
+    "en": {
+        "days": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
+        "months": ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"],
+        "dayparts": {"Ochtend": "Morning", "Middag": "Afternoon", "Avond": "Evening"},
+        "speed_unit": "km/h",
+        "no_window": "no clear window",
+        "all_day": "pretty much all day",
+        "all_day_dips": "throughout the day (with dips)",
+        "spike_around": "short peak around {h0:02d}–{h1:02d}h",
+        "big_part": "most of the day, especially {h0:02d}–{h1:02d}h",
+        "mostly": "mainly {h0:02d}–{h1:02d}h",
+        "best_short_period": "👉 Best moment: no real window (period too short, mostly mush)",
+        "best_all_day_green": "👉 Best moments: fairly consistent all day (08–20h)",
+        "best_all_day": "👉 Best moments: throughout the day, with clearly better spells",
+        "best_spike": "👉 Best moment: short peak {h0:02d}–{h1:02d}h",
+        "best_big_part": "👉 Best moments: most of the day ({h0:02d}–{h1:02d}h)",
+        "best_one": "👉 Best moment: {h0:02d}–{h1:02d}h",
+        "best_none_today": "👉 Best moment: no clear window today",
+        "sessions_title": "🏄 Best sessions in the next {days} days:",
+        "date_label": "{day} {d} {month}",
+        "session_line": "{square} {date} {h0:02d}–{h1:02d}h (score {score:.1f})",
+        "sessions_none": "No usable sessions in this period.",
+        "tomorrow": "Tomorrow",
+        "day_after": "Day after",
+        "future_line": "Window: {phrase}, with ~{wave:.1f} m and {period} s swell.",
+        "why": {"much_wind": "lots of wind", "little_wind": "little wind", "short_period": "short period", "long_period": "long period"},
+        "wind_types": {"onshore": "onshore", "offshore": "offshore", "sideshore": "sideshore"},
+        "no_data": "No surf data available today.",
+        "fetch_error": "Surfbot: Open-Meteo temporarily slow/unreachable. ({err})",
+        "coach": {
+            "short_onshore": "Short period and strong onshore, so mostly chop and little lining up.",
+            "short": "Short period, so it gets messy fast with little real power.",
+            "tiny": "Small with little power, a longboard is your best bet.",
+            "small_short": "Small and short, a longboard or funboard works best.",
+            "onshore_flat": "Enough size, but the wind flattens it quickly; you'll work for your waves.",
+            "offshore_good": "Wind is helping and the period gives room, you can really go for it.",
+            "mixed": "With some patience there are decent sets in between, though it stays inconsistent.",
+        },
+        "ai_language": "Engels",
+        "coach_guard": {"times": [r"\b\d{1,2}\s*(am|pm|h|o'clock)\b"], "hype": [r"\b(great|amazing|awesome|epic|perfect|excellent|fantastic)\s+(surf|surfing|session|waves)\b"]},
+    },
+    "de": {
+        "days": ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag", "Samstag", "Sonntag"],
+        "months": ["Jan", "Feb", "Mär", "Apr", "Mai", "Jun", "Jul", "Aug", "Sep", "Okt", "Nov", "Dez"],
+        "dayparts": {"Ochtend": "Vormittag", "Middag": "Nachmittag", "Avond": "Abend"},
+        "speed_unit": "km/h",
+        "no_window": "kein klares Fenster",
+        "all_day": "praktisch den ganzen Tag",
+        "all_day_dips": "über den Tag verteilt (mit Einbrüchen)",
+        "spike_around": "kurzer Peak um {h0:02d}–{h1:02d} Uhr",
+        "big_part": "großer Teil des Tages, vor allem {h0:02d}–{h1:02d} Uhr",
+        "mostly": "vor allem {h0:02d}–{h1:02d} Uhr",
+        "best_short_period": "👉 Bester Moment: kein echtes Fenster (Periode zu kurz, vor allem Kabbelwasser)",
+        "best_all_day_green": "👉 Beste Momente: den ganzen Tag recht konstant (08–20 Uhr)",
+        "best_all_day": "👉 Beste Momente: über den Tag verteilt, mit deutlich besseren Phasen",
+        "best_spike": "👉 Bester Moment: kurzer Peak {h0:02d}–{h1:02d} Uhr",
+        "best_big_part": "👉 Beste Momente: großer Teil des Tages ({h0:02d}–{h1:02d} Uhr)",
+        "best_one": "👉 Bester Moment: {h0:02d}–{h1:02d} Uhr",
+        "best_none_today": "👉 Bester Moment: heute kein klares Fenster",
+        "sessions_title": "🏄 Beste Sessions in den nächsten {days} Tagen:",
+        "date_label": "{day}, {d}. {month}",
+        "session_line": "{square} {date} {h0:02d}–{h1:02d} Uhr (Score {score:.1f})",
+        "sessions_none": "Keine brauchbaren Sessions in diesem Zeitraum.",
+        "tomorrow": "Morgen",
+        "day_after": "Übermorgen",
+        "future_line": "Fenster: {phrase}, mit ~{wave:.1f} m und {period} s Swell.",
+        "why": {"much_wind": "viel Wind", "little_wind": "wenig Wind", "short_period": "kurze Periode", "long_period": "lange Periode"},
+        "wind_types": {"onshore": "auflandig", "offshore": "ablandig", "sideshore": "seitlich"},
+        "no_data": "Heute keine Surfdaten verfügbar.",
+        "fetch_error": "Surfbot: Open-Meteo vorübergehend langsam/nicht erreichbar. ({err})",
+        "coach": {
+            "short_onshore": "Kurze Periode und viel auflandiger Wind, also vor allem Kabbelwasser ohne Linien.",
+            "short": "Kurze Periode, also schnell unruhig und wenig echte Power.",
+            "tiny": "Klein und wenig Power, das Longboard ist deine beste Chance.",
+            "small_short": "Klein und kurz, Longboard oder Funboard funktioniert am besten.",
+            "onshore_flat": "Höhe reicht, aber der Wind drückt es schnell platt; du musst für deine Wellen arbeiten.",
+            "offshore_good": "Der Wind hilft und die Periode gibt Raum, hier kannst du richtig Gas geben.",
+            "mixed": "Mit etwas Geduld sind brauchbare Sets dabei, auch wenn es wechselhaft bleibt.",
+        },
+        "ai_language": "Duits",
+        "coach_guard": {"times": [r"\b\d{1,2}\s*(uhr|h)\b"], "hype": [r"\b(herrlich\w*|traumhaft\w*|perfekt\w*|genial\w*|super)\s+(surfen|surf|wellen|session)\b"]},
+    },
+}
+DEFAULT_LOCALE = "nl"
+
+
+def locale_texts(locale):
+    return LOCALES.get(locale or DEFAULT_LOCALE, LOCALES[DEFAULT_LOCALE])
+
+
+def date_label(d, locale=DEFAULT_LOCALE):
+    L = locale_texts(locale)
+    return L["date_label"].format(day=L["days"][d.weekday()], d=d.day, month=L["months"][d.month - 1])
+
 DAYPARTS_DEF = {
     "Ochtend": (8, 12),
     "Middag": (12, 16),
@@ -43,12 +189,55 @@ PERIOD_Q_HI = 0.80
 # Als getoonde periode-band te breed wordt, toon "~median (wisselend)"
 PERIOD_MAX_SPREAD_FOR_BAND = 4.0
 
+# Getij (lokaal berekend, zie tide.py) als extra input voor uurscores
+TIDE_ENABLED = os.getenv("SURF_TIDE", "1") != "0"
+
+# HTTP: "stdlib" (urllib, geen pip install nodig) of "requests"
+HTTP_BACKEND = os.getenv("SURF_HTTP", "stdlib")
+
+MARINE_URL = "https://marine-api.open-meteo.com/v1/marine"
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+TELEGRAM_API = "https://api.telegram.org"
+
+# Per-host gezondheid (circuit breaker), bewaard tussen runs
+HOST_STATE_FILE = os.path.join(os.getenv("SURF_CACHE_DIR", ".surfalert"), "hosts.json")
+BREAKER_THRESHOLD = 4  # opeenvolgende mislukte pogingen voordat de breaker opent
+BREAKER_BASE_S = 60  # eerste cooldown; verdubbelt bij elke nieuwe opening
+BREAKER_MAX_S = 3600
+RETRY_AFTER_MAX_S = 30  # langer wachten dan dit? dan niet slapen maar breaker open
+
+# Streaming decode van Open-Meteo (typed arrays i.p.v. lijsten, zie stream_json.py)
+STREAM_JSON = os.getenv("SURF_STREAM_JSON", "0") == "1"
+
+# Delta fetch: per spot de laatst opgehaalde uurreeksen bewaren en alleen ontbrekende of
+# verouderde (toekomstige, ouder dan DELTA_STALE_MIN) uren opnieuw opvragen
+DELTA_FETCH = os.getenv("SURF_DELTA", "0") == "1"
+DELTA_STALE_MIN = int(os.getenv("SURF_DELTA_STALE_MIN", "60"))
+DELTA_DEBUG = os.getenv("SURF_DELTA_DEBUG", "0") == "1"  # per spot loggen hoeveel uur er opgehaald is
+
+# Geschiedenis (SQLite, zie history.py)
+HISTORY_ENABLED = os.getenv("SURF_HISTORY", "1") != "0"
+
+# Multi-spot analyse over een process pool (zie parallel.py); 0 = aantal cores.
+# SURF_PARALLEL=1 (of --parallel): daily en refresh analyseren alle spots in één batch.
+PARALLEL = os.getenv("SURF_PARALLEL", "0") == "1"
+WORKERS = int(os.getenv("SURF_WORKERS", "0"))
+
 # =======================
 # Run-window / verzending (08:00 NL tijd)
 # =======================
 SEND_AT_HOUR = 8
 SEND_AT_MINUTE = 0
 
+# =======================
+# Intraday refresh (ochtendbericht in-place bijwerken)
+# =======================
+CACHE_DIR = os.getenv("SURF_CACHE_DIR", ".surfalert")
+SENT_STATE_FILE = os.path.join(CACHE_DIR, "sent.json")
+REFRESH_EVERY_MIN = int(os.getenv("SURF_REFRESH_EVERY_MIN", "60"))
+REFRESH_UNTIL_HOUR = int(os.getenv("SURF_REFRESH_UNTIL_HOUR", "20"))
+
 
 # =======================
 # Time helpers (Amsterdam-aware)
@@ -83,55 +272,472 @@ def wait_until_send_time(hour=SEND_AT_HOUR, minute=SEND_AT_MINUTE):
 # =======================
 # Network helpers (retries)
 # =======================
-def _safe_get_json(url, params, *, timeout=20, retries=3, backoff_s=2):
+def _http(method, url, *, params=None, json_body=None, headers=None, timeout=20, stream=False):
+    """
+    Minimale HTTP-laag met imports pas bij de eerste request.
+    Geeft (status, headers, body) terug; body is bytes, of bij stream=True een chunk-iterator.
+    """
+    if HTTP_BACKEND == "requests":
+        import requests
+        r = requests.request(
+            method, url, params=params, json=json_body, headers=headers, timeout=timeout, stream=stream
+        )
+        body = r.iter_content(chunk_size=64 * 1024) if stream else r.content
+        return r.status_code, r.headers, body
+
+    import json
+    import urllib.error
+    import urllib.parse
+    import urllib.request
+
+    if params:
+        url = f"{url}?{urllib.parse.urlencode(params)}"
+    hdrs = dict(headers or {})
+    data = None
+    if json_body is not None:
+        data = json.dumps(json_body).encode("utf-8")
+        hdrs.setdefault("Content-Type", "application/json")
+    req = urllib.request.Request(url, data=data, headers=hdrs, method=method)
+    try:
+        resp = urllib.request.urlopen(req, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+    if not stream:
+        with resp:
+            return resp.status, resp.headers, resp.read()
+
+    def chunks():
+        with resp:
+            while True:
+                chunk = resp.read(64 * 1024)
+                if not chunk:
+                    return
+                yield chunk
+
+    return resp.status, resp.headers, chunks()
+
+
+class HTTPStatusError(RuntimeError):
+    def __init__(self, status, detail="", retry_after=None):
+        super().__init__(f"HTTP {status}: {str(detail)[:220]}")
+        self.status = status
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self):
+        return self.status in (408, 425, 429) or self.status >= 500
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+_HOST_STATE = None
+# _thread i.p.v. threading: zelfde lock, zonder ~6 ms extra import bij opstarten
+_HOST_LOCK = _thread.allocate_lock()
+
+
+def _host_state():
+    global _HOST_STATE
+    if _HOST_STATE is None:
+        import json
+        with _HOST_LOCK:
+            if _HOST_STATE is None:
+                try:
+                    with open(HOST_STATE_FILE, encoding="utf-8") as f:
+                        _HOST_STATE = json.load(f)
+                except (OSError, ValueError):
+                    _HOST_STATE = {}
+    return _HOST_STATE
+
+
+def _save_host_state():
+    """
+    Kopie onder de lock, schrijven erbuiten (per thread een eigen tmp-bestand).
+    """
+    import json
+    st = _host_state()
+    with _HOST_LOCK:
+        snapshot = {host: dict(h) for host, h in st.items()}
+    try:
+        os.makedirs(os.path.dirname(HOST_STATE_FILE) or ".", exist_ok=True)
+        tmp = f"{HOST_STATE_FILE}.{os.getpid()}.{_thread.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp, HOST_STATE_FILE)
+    except OSError:
+        pass  # gezondheid bewaren is best-effort
+
+
+def _host_of(url):
+    from urllib.parse import urlsplit
+
+    return urlsplit(url).netloc
+
+
+def _breaker_open_until(host):
+    st = _host_state()
+    with _HOST_LOCK:
+        return st.get(host, {}).get("open_until", 0)
+
+
+def _record_success(host):
+    st = _host_state()
+    with _HOST_LOCK:
+        if not st.get(host, {}).get("failures"):
+            return
+        st[host] = {"failures": 0, "opens": 0, "open_until": 0}
+    _save_host_state()
+
+
+def _record_failure(host, err, retry_after=None):
+    """
+    Tel mislukte pogingen; vanaf BREAKER_THRESHOLD opent de breaker met een cooldown
+    die per opening verdubbelt (adaptief), of tot Retry-After als die langer is.
+    """
+    now = time.time()
+    st = _host_state()
+    with _HOST_LOCK:
+        h = st.setdefault(host, {"failures": 0, "opens": 0, "open_until": 0})
+        h["failures"] += 1
+        h["last_error"] = str(err)[:220]
+        if h["failures"] >= BREAKER_THRESHOLD:
+            h["opens"] += 1
+            cooldown = min(BREAKER_MAX_S, BREAKER_BASE_S * 2 ** (h["opens"] - 1))
+            h["open_until"] = now + cooldown
+        if retry_after is not None and retry_after > RETRY_AFTER_MAX_S:
+            h["open_until"] = max(h["open_until"], now + retry_after)
+    _save_host_state()
+
+
+def _parse_retry_after(value):
+    """
+    Retry-After: seconden of een HTTP-datum; None als onleesbaar.
+    """
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        when = parsedate_to_datetime(value)
+        return max((when - dt.datetime.now(when.tzinfo)).total_seconds(), 0.0)
+    except Exception:
+        return None
+
+
+def _next_delay(prev, base_s, cap_s):
+    # "decorrelated jitter": spreidt retries van veel clients en groeit mee met eerdere delays
+    import random
+
+    return min(cap_s, random.uniform(base_s, max(prev, base_s) * 3))
+
+
+def _sent_nothing(err):
+    """
+    True als de fout zeker vóór het versturen van het verzoek viel (geen verbinding,
+    DNS stuk); urllib en requests verpakken die in eigen excepties.
+    """
+    import socket
+
+    seen = set()
+    todo = [err]
+    while todo:
+        e = todo.pop()
+        if not isinstance(e, BaseException) or id(e) in seen:
+            continue
+        seen.add(id(e))
+        if isinstance(e, (ConnectionRefusedError, socket.gaierror)):
+            return True
+        if type(e).__name__ in ("ConnectTimeout", "ConnectTimeoutError", "NewConnectionError", "NameResolutionError"):
+            return True
+        todo += [e.__cause__, e.__context__, getattr(e, "reason", None), *getattr(e, "args", ())]
+    return False
+
+
+def _with_retries(url, attempt, *, retries=3, base_s=1.0, cap_s=10.0, label=None, idempotent=True):
+    """
+    Voer attempt() uit met het retry-beleid van deze host:
+    - breaker open -> direct CircuitOpenError (milliseconden i.p.v. seconden slapen)
+    - retrybare fout -> decorrelated jitter, of Retry-After als de server die geeft
+    - niet-retrybare HTTP-status -> direct door naar de caller
+    label: naam in foutmeldingen (default de url; geef iets anders als er een token in zit)
+    idempotent=False (bv. sendMessage): alleen opnieuw bij 429/5xx of als er niets
+    verstuurd is; een timeout of reset kan al een bericht hebben afgeleverd.
+    """
+    host = _host_of(url)
+    open_until = _breaker_open_until(host)
+    if open_until > time.time():
+        raise CircuitOpenError(f"{host} staat uit (circuit open nog {int(open_until - time.time())} s)")
+
     last_err = None
-    for attempt in range(retries):
+    delay = base_s
+    tries = 0
+    for tries in range(1, retries + 1):
         try:
-            r = requests.get(url, params=params, timeout=timeout)
-            r.raise_for_status()
-            return r.json()
+            result = attempt()
+        except HTTPStatusError as e:
+            if not e.retryable or (not idempotent and e.status != 429 and e.status < 500):
+                _record_success(host)  # host leeft; het verzoek zelf is fout
+                raise
+            last_err = e
+            _record_failure(host, e, e.retry_after)
         except Exception as e:
             last_err = e
-            if attempt < retries - 1:
-                time.sleep(backoff_s * (attempt + 1))
-    raise RuntimeError(f"GET faalde na {retries} pogingen: {url} ({last_err})")
+            _record_failure(host, e)
+            if not idempotent and not _sent_nothing(e):
+                break
+        else:
+            _record_success(host)
+            return result
+
+        if tries >= retries or _breaker_open_until(host) > time.time():
+            break
+        retry_after = getattr(last_err, "retry_after", None)
+        delay = retry_after if retry_after is not None else _next_delay(delay, base_s, cap_s)
+        time.sleep(delay)
+
+    raise RuntimeError(f"{label or url} faalde na {tries} poging(en) ({last_err})")
+
+
+def _safe_get_json(url, params, *, timeout=20, retries=3, backoff_s=2, stream=False):
+    """
+    stream=True: body per chunk decoderen (stream_json) zodat "hourly" direct in
+    array('d') belandt en de volledige body nooit als lijsten in geheugen staat.
+    """
+    import json
+    import stream_json
+
+    def attempt():
+        status, headers, body = _http("GET", url, params=params, timeout=timeout, stream=stream)
+        if status != 200:
+            raise HTTPStatusError(status, retry_after=_parse_retry_after(headers.get("Retry-After")))
+        if stream:
+            return stream_json.decode_chunks(body)
+        return json.loads(body)
+
+    return _with_retries(url, attempt, retries=retries, base_s=backoff_s, cap_s=backoff_s * 5)
 
 
 # =======================
 # Fetch Open-Meteo
 # =======================
-def get_open_meteo(lat, lon, days=2):
+MARINE_HOURLY = "wave_height,swell_wave_period,wave_period,swell_wave_peak_period"
+WIND_HOURLY = "windspeed_10m,winddirection_10m"
+
+
+def get_open_meteo(lat, lon, days=2, stream=None):
+    stream = STREAM_JSON if stream is None else stream
     marine = _safe_get_json(
-        "https://marine-api.open-meteo.com/v1/marine",
+        MARINE_URL,
         params={
             "latitude": lat,
             "longitude": lon,
             "timezone": TZ,
-            "hourly": "wave_height,swell_wave_period,wave_period,swell_wave_peak_period",
+            "hourly": MARINE_HOURLY,
             "forecast_days": days + 1,
         },
         timeout=20,
         retries=3,
         backoff_s=2,
+        stream=stream,
     )
 
     wind = _safe_get_json(
-        "https://api.open-meteo.com/v1/forecast",
+        FORECAST_URL,
         params={
             "latitude": lat,
             "longitude": lon,
             "timezone": TZ,
-            "hourly": "windspeed_10m,winddirection_10m",
+            "hourly": WIND_HOURLY,
             "forecast_days": days + 1,
         },
         timeout=20,
         retries=3,
         backoff_s=2,
+        stream=stream,
     )
 
     return marine, wind
 
 
+def get_open_meteo_bulk(spots, days=2, stream=None):
+    """
+    Eén multi-location request per endpoint voor alle spots. Geeft per spot
+    (marine, wind) terug, in dezelfde volgorde. Streaming decode (SURF_STREAM_JSON=1)
+    scheelt geheugen bij honderden spots, maar is trager dan json.loads.
+    """
+    stream = STREAM_JSON if stream is None else stream
+    params = {
+        "latitude": ",".join(str(s["lat"]) for s in spots),
+        "longitude": ",".join(str(s["lon"]) for s in spots),
+        "timezone": TZ,
+        "forecast_days": days + 1,
+    }
+    marine = _safe_get_json(MARINE_URL, dict(params, hourly=MARINE_HOURLY), stream=stream)
+    wind = _safe_get_json(FORECAST_URL, dict(params, hourly=WIND_HOURLY), stream=stream)
+
+    # één locatie: Open-Meteo geeft een object i.p.v. een lijst
+    marine = marine if isinstance(marine, list) else [marine]
+    wind = wind if isinstance(wind, list) else [wind]
+    if len(marine) != len(spots) or len(wind) != len(spots):
+        raise RuntimeError(f"Open-Meteo gaf {len(marine)}/{len(wind)} locaties terug voor {len(spots)} spots.")
+    return list(zip(marine, wind))
+
+
+def _series_path(spot):
+    return os.path.join(CACHE_DIR, f"series_{spot['lat']:.3f}_{spot['lon']:.3f}.json")
+
+
+def _load_series(path):
+    import json
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_series(path, store):
+    import json
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(store, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        pass  # volgende run haalt dan gewoon alles op
+
+
+def _wanted_hours(days, now=None):
+    """
+    Lokale uurtijden ("YYYY-MM-DDTHH:MM") van vandaag 00:00 t/m vandaag+days, zoals
+    Open-Meteo ze met timezone=TZ teruggeeft (ook over een zomertijdwissel heen).
+    """
+    now = now or _tz_now_amsterdam()
+    tz = now.tzinfo or dt.timezone.utc
+    start = now.replace(hour=0, minute=0, second=0, microsecond=0).astimezone(dt.timezone.utc)
+    last_date = now.date() + dt.timedelta(days=days)
+    out = []
+    t = start
+    while True:
+        local = t.astimezone(tz)
+        if local.date() > last_date:
+            break
+        out.append(local.strftime("%Y-%m-%dT%H:%M"))
+        t += dt.timedelta(hours=1)
+    return list(dict.fromkeys(out))
+
+
+def _needed_range(wanted, stored, now_key, now_min, stale_min):
+    """
+    (eerste, laatste) uur dat opgehaald moet worden, of None. Nodig = niet bewaard, of
+    vanaf het huidige uur en langer dan stale_min geleden opgehaald (verleden ligt vast).
+    """
+    fetched = dict(zip(stored.get("time", []), stored.get("fetched", [])))
+    need = [
+        ts for ts in wanted
+        if ts not in fetched or (ts >= now_key and now_min - fetched[ts] >= stale_min)
+    ]
+    return (need[0], need[-1]) if need else None
+
+
+def _merge_series(stored, fresh, fields, wanted, now_min):
+    """
+    Nieuwe uren over de bewaarde heen leggen en tot het gevraagde venster inkorten.
+    """
+    rows = {}
+    for i, ts in enumerate(stored.get("time", [])):
+        rows[ts] = ([stored[f][i] for f in fields], stored["fetched"][i])
+    for i, ts in enumerate(fresh.get("time", [])):
+        values = []
+        for f in fields:
+            col = fresh.get(f, [])
+            v = col[i] if i < len(col) else None
+            values.append(None if v is None or v != v else v)  # NaN (streaming) -> None
+        rows[ts] = (values, now_min)
+
+    times = [ts for ts in wanted if ts in rows]
+    merged = {"time": times, "fetched": [rows[ts][1] for ts in times]}
+    for j, f in enumerate(fields):
+        merged[f] = [rows[ts][0][j] for ts in times]
+    return merged
+
+
+def get_open_meteo_delta(spot, days=2, stream=None, now=None):
+    """
+    Zelfde resultaat als get_open_meteo, maar met een lokale kopie per spot in CACHE_DIR:
+    per endpoint wordt alleen het ontbrekende/verouderde uurbereik opgevraagd
+    (start_hour/end_hour), of niets als alles nog vers is.
+    """
+    stream = STREAM_JSON if stream is None else stream
+    now = now or _tz_now_amsterdam()
+    now_key = now.strftime("%Y-%m-%dT%H:00")
+    now_min = int(time.time() // 60)
+    wanted = _wanted_hours(days, now)
+
+    path = _series_path(spot)
+    store = _load_series(path)
+    fetched_hours = {}
+    for kind, url, hourly in (("marine", MARINE_URL, MARINE_HOURLY), ("wind", FORECAST_URL, WIND_HOURLY)):
+        fields = hourly.split(",")
+        stored = store.get(kind) or {}
+        if any(f not in stored for f in fields):
+            stored = {}
+        rng = _needed_range(wanted, stored, now_key, now_min, DELTA_STALE_MIN)
+        fresh = {}
+        if rng:
+            data = _safe_get_json(
+                url,
+                params={
+                    "latitude": spot["lat"],
+                    "longitude": spot["lon"],
+                    "timezone": TZ,
+                    "hourly": hourly,
+                    "start_hour": rng[0],
+                    "end_hour": rng[1],
+                },
+                timeout=20,
+                retries=3,
+                backoff_s=2,
+                stream=stream,
+            )
+            fresh = data.get("hourly", {})
+        fetched_hours[kind] = len(fresh.get("time", []))
+        store[kind] = _merge_series(stored, fresh, fields, wanted, now_min)
+
+    _save_series(path, store)
+    if DELTA_DEBUG:
+        print(f"Delta fetch {spot['name']}: marine {fetched_hours['marine']}, wind {fetched_hours['wind']} "
+              f"van {len(wanted)} uur opgehaald.")
+
+    # wind uitlijnen op de marine-tijdas (summarize_forecast indexeert beide met dezelfde i)
+    marine_h = store["marine"]
+    wind_h = store["wind"]
+    wind_idx = {ts: i for i, ts in enumerate(wind_h["time"])}
+    wind_fields = WIND_HOURLY.split(",")
+    marine = {"hourly": {f: marine_h[f] for f in ["time"] + MARINE_HOURLY.split(",")}}
+    wind = {"hourly": {"time": marine_h["time"]}}
+    for f in wind_fields:
+        col = wind_h[f]
+        wind["hourly"][f] = [col[wind_idx[ts]] if ts in wind_idx else None for ts in marine_h["time"]]
+    return marine, wind
+
+
+def fetch_forecast(spot, days=2):
+    """
+    (marine, wind) voor één spot: delta tegen de lokale kopie als SURF_DELTA=1, anders alles.
+    """
+    if DELTA_FETCH:
+        return get_open_meteo_delta(spot, days=days)
+    return get_open_meteo(spot["lat"], spot["lon"], days=days)
+
+
 # =======================
 # Wind helpers
 # =======================
@@ -154,6 +760,27 @@ def period_is_short(t):
 # =======================
 # Stats helpers
 # =======================
+def _mean(values):
+    """
+    Correct afgerond gemiddelde, net als statistics.mean, maar zonder die import
+    (fractions/decimal kosten meer dan de rekentijd). Float-noemers zijn machten
+    van 2, dus de som is exact in integers en int/int deelt correct afgerond.
+    """
+    ratios = [float(v).as_integer_ratio() for v in values]
+    den = max(d for _, d in ratios)
+    num = sum(n * (den // d) for n, d in ratios)
+    return num / (den * len(ratios))
+
+
+def _median(values):
+    xs = sorted(values)
+    n = len(xs)
+    mid = n // 2
+    if n % 2:
+        return xs[mid]
+    return (xs[mid - 1] + xs[mid]) / 2
+
+
 def quantile(values, q):
     if not values:
         return None
@@ -187,8 +814,8 @@ def trend_label(values):
     b = values[mid:]
     if not a or not b:
         return "onzeker"
-    ma = stats.median(a)
-    mb = stats.median(b)
+    ma = _median(a)
+    mb = _median(b)
     diff = mb - ma
 
     if abs(diff) < 0.4:
@@ -234,74 +861,292 @@ def fmt_period_band(lo, hi, unit="s", median=None):
     return f"{lo_i}–{hi_i} {unit}"
 
 
+# =======================
+# Scoringsprofielen
+# =======================
+# Elk profiel is een set staptabellen; "standaard" is exact de oude vaste mening.
+# - height: [(grens, punten)] -> eerste regel met H < grens (grens None = rest)
+# - period: [(grens, punten)] -> eerste regel met T >= grens, anders 0
+# - wind:   [(grens, punten)] -> eerste regel met W <= grens, anders 0
+# - dir:    per windtype een vaste "bonus" plus "over": [(grens, punten)] -> eerste
+#           regel met W > grens (grens None = rest), aflopend gesorteerd
+# - caps:   [(grens, max)] -> eerste regel met H < grens kapt de score op max
+# - tide:   [(grens, punten)] -> eerste regel met waterstand (m NAP) <= grens (alleen uurscores)
+# - tide_rising: bonus bij opkomend water
+# - green_score / green_energy / orange_score: stoplicht-drempels
+# - window_thr: minimale uurscore voor een cluster
+SCORING_PROFILES = {
+    "standaard": {
+        "height": [(0.4, 0.0), (0.6, 0.3), (0.8, 0.6), (1.2, 1.0), (None, 1.2)],
+        "period": [(8, 1.0), (7, 0.8), (6, 0.5), (5, 0.3)],
+        "wind": [(10, 1.0), (18, 0.7), (26, 0.3)],
+        "dir": {
+            "offshore": {"bonus": 0.4, "over": [(25, -0.2)]},
+            "onshore": {"over": [(28, -0.8), (20, -0.5), (None, -0.2)]},
+            "sideshore": {"over": [(28, -0.2)]},
+        },
+        "caps": [(0.4, 0.5), (0.6, 1.0)],
+        "tide": [(-0.6, -0.1), (0.8, 0.0), (None, -0.2)],
+        "tide_rising": 0.1,
+        "green_score": 2.3,
+        "green_energy": 2.5,
+        "orange_score": 1.0,
+        "window_thr": 1.0,
+    },
+    # Klein en zacht mag; periode minder kritisch, wind juist wel
+    "longboard": {
+        "height": [(0.3, 0.0), (0.5, 0.6), (0.8, 1.0), (1.2, 0.9), (None, 0.5)],
+        "period": [(7, 1.0), (6, 0.8), (5, 0.6), (4, 0.3)],
+        "wind": [(12, 1.0), (20, 0.6), (26, 0.2)],
+        "dir": {
+            "offshore": {"bonus": 0.4, "over": [(20, -0.3)]},
+            "onshore": {"over": [(24, -0.9), (15, -0.6), (None, -0.3)]},
+            "sideshore": {"over": [(24, -0.3)]},
+        },
+        "caps": [(0.3, 0.5)],
+        "tide": [(-0.6, -0.2), (0.9, 0.0), (None, -0.1)],
+        "tide_rising": 0.1,
+        "green_score": 2.2,
+        "green_energy": 1.0,
+        "orange_score": 1.0,
+        "window_thr": 1.0,
+    },
+    # Pas vanaf borsthoog interessant, periode is alles
+    "shortboard": {
+        "height": [(0.6, 0.0), (0.8, 0.3), (1.0, 0.7), (1.5, 1.1), (None, 1.3)],
+        "period": [(9, 1.1), (8, 0.9), (7, 0.6), (6, 0.3)],
+        "wind": [(10, 1.0), (18, 0.7), (26, 0.3)],
+        "dir": {
+            "offshore": {"bonus": 0.4, "over": [(30, -0.2)]},
+            "onshore": {"over": [(28, -0.8), (20, -0.5), (None, -0.2)]},
+            "sideshore": {"over": [(28, -0.2)]},
+        },
+        "caps": [(0.6, 0.5), (0.8, 1.0)],
+        "tide": [(0.6, 0.0), (None, -0.3)],
+        "tide_rising": 0.1,
+        "green_score": 2.4,
+        "green_energy": 3.5,
+        "orange_score": 1.1,
+        "window_thr": 1.1,
+    },
+    # Klein, rustig en voorspelbaar; groot is juist minder
+    "beginner": {
+        "height": [(0.3, 0.2), (0.5, 0.8), (0.8, 1.0), (1.0, 0.5), (None, 0.0)],
+        "period": [(7, 0.8), (5, 0.6), (4, 0.3)],
+        "wind": [(8, 1.0), (14, 0.7), (20, 0.3)],
+        "dir": {
+            "offshore": {"bonus": 0.2, "over": [(15, -0.4)]},
+            "onshore": {"over": [(20, -1.0), (12, -0.6), (None, -0.2)]},
+            "sideshore": {"over": [(20, -0.3)]},
+        },
+        "caps": [],
+        "tide": [(-0.6, -0.2), (0.7, 0.0), (None, -0.3)],
+        "tide_rising": 0.0,
+        "green_score": 2.0,
+        "green_energy": 0.5,
+        "orange_score": 1.0,
+        "window_thr": 1.0,
+    },
+}
+
+DEFAULT_PROFILE = "standaard"
+
+
+# Staptabellen: (grens, punten); None als grens = "de rest" (alleen waar de stapfunctie dat kent)
+_PROFILE_TABLES = {"height": True, "period": False, "wind": True, "caps": False, "tide": True}
+_PROFILE_SCALARS = ("tide_rising", "green_score", "green_energy", "orange_score", "window_thr")
+_WIND_DIRS = ("offshore", "onshore", "sideshore")
+
+
+def _is_num(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _check_table(key, table, allow_open):
+    if not isinstance(table, (list, tuple)):
+        raise RuntimeError(f"Profiel: {key} moet een lijst van [grens, punten] zijn.")
+    for i, row in enumerate(table):
+        if not isinstance(row, (list, tuple)) or len(row) != 2 or not _is_num(row[1]):
+            raise RuntimeError(f"Profiel: {key}[{i}] moet [grens, punten] met numerieke punten zijn.")
+        lim = row[0]
+        if lim is None and allow_open and i == len(table) - 1:
+            continue
+        if not _is_num(lim):
+            raise RuntimeError(f"Profiel: {key}[{i}] heeft een ongeldige grens {lim!r}.")
+
+
+def resolve_profile(spec):
+    """
+    - str: naam uit SCORING_PROFILES.
+    - dict: eigen profiel van een abonnee; "base" (default: standaard) + overrides.
+      Overrides worden gevalideerd; "dir" wordt per windrichting over de basis gelegd.
+    """
+    if isinstance(spec, str):
+        if spec not in SCORING_PROFILES:
+            raise RuntimeError(f"Onbekend scoringsprofiel: {spec}")
+        return SCORING_PROFILES[spec]
+    if not isinstance(spec, dict):
+        raise RuntimeError(f"Profiel moet een naam of object zijn, niet {type(spec).__name__}.")
+    base_name = spec.get("base", DEFAULT_PROFILE)
+    if not isinstance(base_name, str):
+        raise RuntimeError("Profiel: base moet de naam van een ingebouwd profiel zijn.")
+    base = resolve_profile(base_name)
+
+    prof = dict(base)
+    for key, value in spec.items():
+        if key in ("base", "name"):
+            continue
+        if key in _PROFILE_TABLES:
+            _check_table(key, value, _PROFILE_TABLES[key])
+            prof[key] = [tuple(row) for row in value]
+        elif key in _PROFILE_SCALARS:
+            if not _is_num(value):
+                raise RuntimeError(f"Profiel: {key} moet een getal zijn.")
+            prof[key] = value
+        elif key == "dir":
+            if not isinstance(value, dict) or any(k not in _WIND_DIRS for k in value):
+                raise RuntimeError(f"Profiel: dir kent alleen {', '.join(_WIND_DIRS)}.")
+            dirs = dict(base["dir"])
+            for wt, rule in value.items():
+                if not isinstance(rule, dict) or any(k not in ("bonus", "over") for k in rule):
+                    raise RuntimeError(f"Profiel: dir.{wt} kent alleen bonus en over.")
+                merged = dict(dirs[wt])
+                if "bonus" in rule:
+                    if not _is_num(rule["bonus"]):
+                        raise RuntimeError(f"Profiel: dir.{wt}.bonus moet een getal zijn.")
+                    merged["bonus"] = rule["bonus"]
+                if "over" in rule:
+                    _check_table(f"dir.{wt}.over", rule["over"], True)
+                    merged["over"] = [tuple(row) for row in rule["over"]]
+                dirs[wt] = merged
+            prof["dir"] = dirs
+        else:
+            raise RuntimeError(f"Profiel: onbekende sleutel {key!r}.")
+    return prof
+
+
+def _custom_profile_name(prof):
+    """
+    Eigen profielen krijgen een naam op basis van hun inhoud: gelijke inhoud = één
+    analyse, en een zelfgekozen naam kan nooit een ingebouwd of ander profiel overschrijven.
+    """
+    import json
+    import hashlib
+
+    blob = json.dumps(prof, sort_keys=True)
+    return f"eigen-{hashlib.sha1(blob.encode()).hexdigest()[:10]}"
+
+
+def active_profiles(subscribers):
+    """
+    Dedupliceert abonnee-profielen tot een set unieke profielen.
+    Geeft (profiles: naam -> profiel, per_sub: profielnaam per abonnee) terug.
+    Eigen profielen met dezelfde inhoud delen één naam, dus duizenden abonnees
+    kosten net zoveel analyse als het aantal verschillende profielen.
+    """
+    profiles = {}
+    per_sub = []
+    for sub in subscribers:
+        spec = sub.get("profile", DEFAULT_PROFILE)
+        prof = resolve_profile(spec)
+        name = spec if isinstance(spec, str) else _custom_profile_name(prof)
+        profiles[name] = prof
+        per_sub.append(name)
+    return profiles, per_sub
+
+
 # =======================
 # Score & kleur
 # =======================
-def score_for_conditions(H, T, W, dir_type):
-    if H is None or T is None or W is None:
-        return 0.0
+def _step_below(x, table):
+    for lim, pts in table:
+        if lim is None or x < lim:
+            return pts
+    return 0.0
 
-    score = 0.0
 
-    # Hoogte
-    if H < 0.4:
-        score += 0.0
-    elif H < 0.6:
-        score += 0.3
-    elif H < 0.8:
-        score += 0.6
-    elif H < 1.2:
-        score += 1.0
-    else:
-        score += 1.2
-
-    # Periode
-    if T >= 8:
-        score += 1.0
-    elif T >= 7:
-        score += 0.8
-    elif T >= 6:
-        score += 0.5
-    elif T >= 5:
-        score += 0.3
-
-    # Windkracht
-    if W <= 10:
-        score += 1.0
-    elif W <= 18:
-        score += 0.7
-    elif W <= 26:
-        score += 0.3
+def _step_at_least(x, table):
+    for lim, pts in table:
+        if x >= lim:
+            return pts
+    return 0.0
+
+
+def _step_at_most(x, table):
+    for lim, pts in table:
+        if lim is None or x <= lim:
+            return pts
+    return 0.0
+
+
+def _step_above(x, table):
+    for lim, pts in table:
+        if lim is None or x > lim:
+            return pts
+    return 0.0
+
+
+def _score_with(prof, H, T, W, dir_type, tide_hour=None):
+    score = 0.0
+    score += _step_below(H, prof["height"])
+    score += _step_at_least(T, prof["period"])
+    score += _step_at_most(W, prof["wind"])
 
     # Windrichting
-    if dir_type == "offshore":
-        score += 0.4
-        if W > 25:
-            score -= 0.2
-    elif dir_type == "onshore":
-        if W > 28:
-            score -= 0.8
-        elif W > 20:
-            score -= 0.5
-        else:
-            score -= 0.2
-    else:  # sideshore
-        if W > 28:
-            score -= 0.2
+    rule = prof["dir"].get(dir_type) or prof["dir"]["sideshore"]
+    if "bonus" in rule:
+        score += rule["bonus"]
+    pen = _step_above(W, rule.get("over", []))
+    if pen:
+        score += pen
+
+    # Getij (alleen op uurniveau; daggemiddelden hebben geen getij)
+    if tide_hour is not None and prof.get("tide"):
+        level, phase = tide_hour
+        adj = _step_at_most(level, prof["tide"])
+        if phase < 0.5:
+            adj += prof.get("tide_rising", 0.0)
+        if adj:
+            score += adj
 
     # Caps bij te klein
-    if H < 0.4:
-        score = min(score, 0.5)
-    elif H < 0.6:
-        score = min(score, 1.0)
+    for lim, cap in prof["caps"]:
+        if H < lim:
+            score = min(score, cap)
+            break
 
     return score
 
 
-def color_from_score_energy(score, energy):
-    if score >= 2.3 and energy >= 2.5:
+def score_for_conditions(H, T, W, dir_type, profile=None, tide_hour=None):
+    if H is None or T is None or W is None:
+        return 0.0
+    prof = profile if profile is not None else SCORING_PROFILES[DEFAULT_PROFILE]
+    return _score_with(prof, H, T, W, dir_type, tide_hour)
+
+
+def score_hours_batch(profiles, conditions):
+    """
+    Batch-evaluatie (profielen x uren) in één pass.
+    conditions: lijst van (H, T, W, dir_type, tide_hour); geeft {naam: [score per conditie]}.
+    tide_hour is (waterstand, fase) of None. Ontbrekende waarden scoren 0.0, net als
+    score_for_conditions.
+    """
+    valid = [not (H is None or T is None or W is None) for H, T, W, _, _ in conditions]
+    out = {}
+    for name, prof in profiles.items():
+        out[name] = [
+            _score_with(prof, H, T, W, wt, th) if ok else 0.0
+            for (H, T, W, wt, th), ok in zip(conditions, valid)
+        ]
+    return out
+
+
+def color_from_score_energy(score, energy, profile=None):
+    prof = profile if profile is not None else SCORING_PROFILES[DEFAULT_PROFILE]
+    if score >= prof["green_score"] and energy >= prof["green_energy"]:
         return "🟢"
-    if score >= 1.0:
+    if score >= prof["orange_score"]:
         return "🟠"
     return "🔴"
 
@@ -344,7 +1189,7 @@ def choose_period_hour(t_peak, t_wave, t_swell):
     if t_peak is not None:
         refs = [v for k, v in candidates if k in ("wave", "swell") and v is not None]
         if refs:
-            ref = stats.median(refs)
+            ref = _median(refs)
             if abs(t_peak - ref) <= 4.0:
                 return ("peak", t_peak)
 
@@ -356,7 +1201,7 @@ def choose_period_hour(t_peak, t_wave, t_swell):
 # =======================
 # Analyse kern
 # =======================
-def build_day_features(hrs, waves, t_swell, t_wave, t_peak, winds, dirs, date):
+def build_day_features(hrs, waves, t_swell, t_wave, t_peak, winds, dirs, date, profiles=None, spot=None, tides=None):
     ids = [
         i for i, ts in enumerate(hrs)
         if ts.startswith(str(date)) and 8 <= int(ts[11:13]) < 20
@@ -388,6 +1233,7 @@ def build_day_features(hrs, waves, t_swell, t_wave, t_peak, winds, dirs, date):
             "wind_type": wt,
             "period": tp,
             "period_src": src,
+            "tide": tides[i0] if tides else None,
         }
 
     if len(hourly) < 6:
@@ -399,53 +1245,64 @@ def build_day_features(hrs, waves, t_swell, t_wave, t_peak, winds, dirs, date):
     wind_h = [hourly[h]["wind"] for h in hours_sorted]
     wtype_h = [hourly[h]["wind_type"] for h in hours_sorted]
 
-    avg_wave = stats.mean(waves_h)
-    avg_per = stats.mean(per_h)
-    rep_per = stats.median(per_h)
-    avg_wind = stats.mean(wind_h)
+    avg_wave = _mean(waves_h)
+    avg_per = _mean(per_h)
+    rep_per = _median(per_h)
+    avg_wind = _mean(wind_h)
 
     day_wt = max(set(wtype_h), key=wtype_h.count)
 
     energy = 0.49 * (avg_wave ** 2) * avg_per
-    day_score = score_for_conditions(avg_wave, avg_per, avg_wind, day_wt)
-
-    # hourly_scores (BELANGRIJK: deze gebruiken we voor precieze vensters)
-    hourly_scores = {
-        int(h): float(
-            score_for_conditions(
-                hourly[h]["wave"],
-                hourly[h]["period"],
-                hourly[h]["wind"],
-                hourly[h]["wind_type"],
-            )
-        )
+
+    # dagdelen: gemiddelden (profielonafhankelijk)
+    parts = []
+    for name, (h0, h1) in DAYPARTS_DEF.items():
+        hs = [h for h in range(h0, h1) if h in hourly]
+        if not hs:
+            continue
+        pw = [hourly[h]["wave"] for h in hs]
+        pt = [hourly[h]["period"] for h in hs]
+        pwind = [hourly[h]["wind"] for h in hs]
+        pwt = [hourly[h]["wind_type"] for h in hs]
+        p_wave_avg = _mean(pw)
+        p_per_avg = _mean(pt)
+        parts.append({
+            "name": name,
+            "pw": pw,
+            "pt": pt,
+            "wave_avg": p_wave_avg,
+            "per_avg": p_per_avg,
+            "per_rep": _median(pt),
+            "wind_avg": _mean(pwind),
+            "dir_type": max(set(pwt), key=pwt.count),
+            "energy": 0.49 * (p_wave_avg ** 2) * p_per_avg,
+        })
+
+    # Eén batch-evaluatie (profielen x condities): uren, daggemiddelde, dagdelen
+    active = {DEFAULT_PROFILE: SCORING_PROFILES[DEFAULT_PROFILE]}
+    active.update(profiles or {})
+    conditions = [
+        (hourly[h]["wave"], hourly[h]["period"], hourly[h]["wind"], hourly[h]["wind_type"], hourly[h]["tide"])
         for h in hours_sorted
+    ]
+    conditions.append((avg_wave, avg_per, avg_wind, day_wt, None))
+    conditions.extend((p["wave_avg"], p["per_avg"], p["wind_avg"], p["dir_type"], None) for p in parts)
+    batch = score_hours_batch(active, conditions)
+
+    n_h = len(hours_sorted)
+    per_profile = {
+        name: _profile_day_result(
+            active[name], hours_sorted, scores[:n_h], scores[n_h], scores[n_h + 1:], parts, energy, rep_per
+        )
+        for name, scores in batch.items()
     }
-
-    # clusters (uren boven drempel)
-    base_thr = 1.0
-    rel_thr = 0.7 * max(day_score, 0.0001)
-    thr = max(base_thr, rel_thr)
-
-    good_hours = sorted([h for h, s in hourly_scores.items() if s >= thr])
-
-    clusters = []
-    if good_hours:
-        start = prev = good_hours[0]
-        scores_cluster = [hourly_scores[start]]
-        for h in good_hours[1:]:
-            if h == prev + 1:
-                scores_cluster.append(hourly_scores[h])
-                prev = h
-            else:
-                clusters.append({"start": start, "end": prev + 1, "score": stats.mean(scores_cluster)})
-                start = prev = h
-                scores_cluster = [hourly_scores[h]]
-        clusters.append({"start": start, "end": prev + 1, "score": stats.mean(scores_cluster)})
-
-    best_cluster_score = max((c["score"] for c in clusters), default=day_score)
-    day_color = color_from_score_energy(best_cluster_score, energy)
-    day_color = enforce_period_color(day_color, rep_per)
+    base = per_profile[DEFAULT_PROFILE]
+    day_score = base["day_score"]
+    hourly_scores = base["hourly_scores"]
+    thr = base["threshold"]
+    clusters = base["clusters"]
+    good_hours = base["good_hours"]
+    day_color = base["color"]
 
     def pct(val):
         return round(100 * sum(1 for x in wtype_h if x == val) / len(wtype_h))
@@ -454,18 +1311,18 @@ def build_day_features(hrs, waves, t_swell, t_wave, t_peak, winds, dirs, date):
     src_mode = max(set(srcs), key=srcs.count) if srcs else "unknown"
 
     diag = {
-        "spot": SPOT["name"],
+        "spot": (spot or SPOT)["name"],
         "period_src_mode": src_mode,
         "period_trend": trend_label(per_h),
         "wave_min": round(min(waves_h), 2),
         "wave_max": round(max(waves_h), 2),
-        "wave_med": round(stats.median(waves_h), 2),
+        "wave_med": round(_median(waves_h), 2),
         "period_min": round(min(per_h), 1),
         "period_max": round(max(per_h), 1),
-        "period_med": round(stats.median(per_h), 1),
+        "period_med": round(_median(per_h), 1),
         "wind_min": round(min(wind_h), 1),
         "wind_max": round(max(wind_h), 1),
-        "wind_med": round(stats.median(wind_h), 1),
+        "wind_med": round(_median(wind_h), 1),
         "onshore_pct": pct("onshore"),
         "offshore_pct": pct("offshore"),
         "sideshore_pct": pct("sideshore"),
@@ -483,48 +1340,28 @@ def build_day_features(hrs, waves, t_swell, t_wave, t_peak, winds, dirs, date):
             "ws": round(hourly[h]["wind"], 1),
             "wt": hourly[h]["wind_type"],
             "src": hourly[h]["period_src"],
+            **(
+                {"tide": round(hourly[h]["tide"][0], 2), "tp": tide.phase_label(hourly[h]["tide"][1])}
+                if hourly[h]["tide"] else {}
+            ),
         }
         for h in hours_sorted
     ]
 
-    # dagdelen
     dayparts = {}
-    for name, (h0, h1) in DAYPARTS_DEF.items():
-        hs = [h for h in range(h0, h1) if h in hourly]
-        if not hs:
-            continue
-
-        pw = [hourly[h]["wave"] for h in hs]
-        pt = [hourly[h]["period"] for h in hs]
-        pwind = [hourly[h]["wind"] for h in hs]
-        pwt = [hourly[h]["wind_type"] for h in hs]
-
-        p_wave_avg = stats.mean(pw)
-        p_per_avg = stats.mean(pt)
-        p_per_rep = stats.median(pt)
-        p_wind_avg = stats.mean(pwind)
-        p_dir_type = max(set(pwt), key=pwt.count)
-
-        p_energy = 0.49 * (p_wave_avg ** 2) * p_per_avg
-        p_score = score_for_conditions(p_wave_avg, p_per_avg, p_wind_avg, p_dir_type)
-        p_color = color_from_score_energy(p_score, p_energy)
-        p_color = enforce_period_color(p_color, p_per_rep)
-
-        # visuele cap bij harde onshore
-        p_color = cap_color_for_wind(p_color, p_dir_type, p_wind_avg)
-
+    for p in parts:
         # robuuste band voor periode
-        t_lo, t_hi = robust_band(pt, PERIOD_Q_LO, PERIOD_Q_HI)
+        t_lo, t_hi = robust_band(p["pt"], PERIOD_Q_LO, PERIOD_Q_HI)
 
-        dayparts[name] = {
-            "color": p_color,
-            "h_min": min(pw),
-            "h_max": max(pw),
+        dayparts[p["name"]] = {
+            "color": base["daypart_colors"][p["name"]],
+            "h_min": min(p["pw"]),
+            "h_max": max(p["pw"]),
             "t_min": t_lo,
             "t_max": t_hi,
-            "t_rep": p_per_rep,
-            "wind_avg": p_wind_avg,
-            "wind_type": p_dir_type,
+            "t_rep": p["per_rep"],
+            "wind_avg": p["wind_avg"],
+            "wind_type": p["dir_type"],
         }
 
     return {
@@ -543,10 +1380,122 @@ def build_day_features(hrs, waves, t_swell, t_wave, t_peak, winds, dirs, date):
         "diag": diag,
         "hourly_compact": hourly_compact,
         "hourly_scores": hourly_scores,  # <-- NIEUW: nodig voor precieze vensters
+        "profiles": per_profile,
+    }
+
+
+def _profile_day_result(prof, hours_sorted, h_scores, day_score, part_scores, parts, energy, rep_per):
+    """
+    Scores -> drempel, clusters en kleuren voor één profiel.
+    """
+    hourly_scores = {int(h): float(s) for h, s in zip(hours_sorted, h_scores)}
+
+    # clusters (uren boven drempel)
+    base_thr = prof["window_thr"]
+    rel_thr = 0.7 * max(day_score, 0.0001)
+    thr = max(base_thr, rel_thr)
+
+    good_hours = sorted([h for h, s in hourly_scores.items() if s >= thr])
+
+    clusters = []
+    if good_hours:
+        start = prev = good_hours[0]
+        scores_cluster = [hourly_scores[start]]
+        for h in good_hours[1:]:
+            if h == prev + 1:
+                scores_cluster.append(hourly_scores[h])
+                prev = h
+            else:
+                clusters.append({"start": start, "end": prev + 1, "score": _mean(scores_cluster)})
+                start = prev = h
+                scores_cluster = [hourly_scores[h]]
+        clusters.append({"start": start, "end": prev + 1, "score": _mean(scores_cluster)})
+
+    best_cluster_score = max((c["score"] for c in clusters), default=day_score)
+    day_color = color_from_score_energy(best_cluster_score, energy, prof)
+    day_color = enforce_period_color(day_color, rep_per)
+
+    daypart_colors = {}
+    for p, p_score in zip(parts, part_scores):
+        p_color = color_from_score_energy(p_score, p["energy"], prof)
+        p_color = enforce_period_color(p_color, p["per_rep"])
+        # visuele cap bij harde onshore
+        daypart_colors[p["name"]] = cap_color_for_wind(p_color, p["dir_type"], p["wind_avg"])
+
+    return {
+        "day_score": day_score,
+        "threshold": thr,
+        "hourly_scores": hourly_scores,
+        "good_hours": good_hours,
+        "clusters": clusters,
+        "color": day_color,
+        "daypart_colors": daypart_colors,
     }
 
 
-def summarize_forecast(marine, wind, days_out=3):
+def profile_day(day, name):
+    """
+    Dag-dict zoals dat profiel hem ziet: scores, clusters en kleuren vervangen,
+    zodat venster- en berichtfuncties ongewijzigd per profiel werken.
+    """
+    if not name or name == DEFAULT_PROFILE:
+        return day
+    res = (day.get("profiles") or {}).get(name)
+    if res is None:
+        raise RuntimeError(f"Profiel {name} is niet mee-geanalyseerd.")
+    out = dict(day)
+    out["day_score"] = res["day_score"]
+    out["threshold"] = res["threshold"]
+    out["hourly_scores"] = res["hourly_scores"]
+    out["clusters"] = res["clusters"]
+    out["color"] = res["color"]
+    out["dayparts"] = {
+        k: dict(v, color=res["daypart_colors"].get(k, v["color"]))
+        for k, v in (day.get("dayparts") or {}).items()
+    }
+    out["diag"] = dict(day.get("diag") or {}, thr=round(res["threshold"], 2), good_hours_count=len(res["good_hours"]))
+    return out
+
+
+def profile_summary(summary, name):
+    return [profile_day(d, name) for d in summary]
+
+
+class _Series:
+    """
+    Read-only view op een Open-Meteo uurarray (lijst of array('d') met NaN voor null).
+    Schaal/offset worden per opgevraagde index toegepast; ontbrekend, NaN of voorbij
+    het einde geeft None. Zo hoeft de hele array nooit gekopieerd te worden.
+    """
+
+    __slots__ = ("arr", "n", "mult", "add", "plain")
+
+    def __init__(self, arr, n, mult=1.0, add=0.0):
+        self.arr = arr
+        self.n = n
+        self.mult = mult
+        self.add = add
+        self.plain = mult == 1.0 and add == 0.0
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        if i >= self.n or i >= len(self.arr):
+            return None
+        v = self.arr[i]
+        if v is None or v != v:
+            return None
+        if self.plain:
+            return v
+        if self.mult != 1.0:
+            v = v * self.mult
+        if self.add != 0.0:
+            v = v + self.add
+        return v
+
+
+def summarize_forecast(marine, wind, days_out=3, profiles=None, spot=None):
     hrs = marine.get("hourly", {}).get("time", [])
     if not hrs:
         return []
@@ -559,38 +1508,26 @@ def summarize_forecast(marine, wind, days_out=3):
     winds_raw = wind.get("hourly", {}).get("windspeed_10m", [])
     dirs_raw = wind.get("hourly", {}).get("winddirection_10m", [])
 
-    waves = [(h * WAVE_MULT) if h is not None else None for h in waves_raw]
-
-    def adj_period(arr):
-        return [(p + PERIOD_BIAS_S) if p is not None else None for p in arr]
-
-    t_swell = adj_period(swell_period_raw)
-    t_wave = adj_period(wave_period_raw)
-    t_peak = adj_period(peak_period_raw)
-
-    winds = [w if w is not None else None for w in winds_raw]
-    dirs = [d if d is not None else None for d in dirs_raw]
-
-    # guard: arrays kunnen soms korter zijn, pad met None
+    # Views i.p.v. kopieën: kalibratie en padding per index (lijsten én array('d'))
     n = len(hrs)
+    waves = _Series(waves_raw, n, mult=WAVE_MULT)
+    t_swell = _Series(swell_period_raw, n, add=PERIOD_BIAS_S)
+    t_wave = _Series(wave_period_raw, n, add=PERIOD_BIAS_S)
+    t_peak = _Series(peak_period_raw, n, add=PERIOD_BIAS_S)
+    winds = _Series(winds_raw, n)
+    dirs = _Series(dirs_raw, n)
 
-    def pad(arr):
-        if len(arr) >= n:
-            return arr[:n]
-        return arr + [None] * (n - len(arr))
-
-    waves = pad(waves)
-    t_swell = pad(t_swell)
-    t_wave = pad(t_wave)
-    t_peak = pad(t_peak)
-    winds = pad(winds)
-    dirs = pad(dirs)
+    # getij per uur: O(1) reads uit de voorgerekende jaartabel
+    station = (spot or SPOT).get("tide")
+    tides = tide.hourly_tide(hrs, TZ, station) if (TIDE_ENABLED and station) else None
 
     start_date = dt.date.fromisoformat(hrs[0][:10])
     out = []
     for d in range(days_out):
         date = start_date + dt.timedelta(days=d)
-        day = build_day_features(hrs, waves, t_swell, t_wave, t_peak, winds, dirs, date)
+        day = build_day_features(
+            hrs, waves, t_swell, t_wave, t_peak, winds, dirs, date, profiles=profiles, spot=spot, tides=tides
+        )
         if day:
             out.append(day)
     return out
@@ -668,55 +1605,189 @@ def _is_truly_all_day(day):
     return False
 
 
-def natural_window_phrase(day):
+def natural_window_phrase(day, locale=DEFAULT_LOCALE):
+    L = locale_texts(locale)
     clusters = day.get("clusters") or []
     if not clusters:
-        return "geen duidelijk venster"
+        return L["no_window"]
 
     if _is_truly_all_day(day):
-        return "vrijwel de hele dag"
+        return L["all_day"]
 
     best = _best_precise_window_from_hours(day, ratio=0.92, min_len=2)
     if best:
         h0, h1, is_spike = best
         length = h1 - h0
         if is_spike:
-            return f"kort piekje rond {h0:02d}–{h1:02d}u"
+            return L["spike_around"].format(h0=h0, h1=h1)
         # als het lang is maar niet “all day”, klinkt dit menselijker dan “haha hele dag”
         if length >= 7:
-            return f"groot deel van de dag, vooral {h0:02d}–{h1:02d}u"
-        return f"vooral {h0:02d}–{h1:02d}u"
+            return L["big_part"].format(h0=h0, h1=h1)
+        return L["mostly"].format(h0=h0, h1=h1)
 
     # fallback: beste cluster
     top = sorted(clusters, key=lambda c: (c["score"], (c["end"] - c["start"])), reverse=True)[0]
-    return f"vooral {top['start']:02d}–{top['end']:02d}u"
+    return L["mostly"].format(h0=top["start"], h1=top["end"])
 
 
-def best_moments_line(day):
+def best_moments_line(day, locale=DEFAULT_LOCALE):
+    L = locale_texts(locale)
     if period_is_short(day.get("rep_per", day.get("avg_per"))):
-        return "👉 Beste moment: geen echt venster (te korte periode, vooral rommel)"
+        return L["best_short_period"]
 
     if _is_truly_all_day(day):
         if day.get("color") == "🟢":
-            return "👉 Beste momenten: de hele dag vrij consistent (08–20u)"
-        return "👉 Beste momenten: door de dag heen, met duidelijk betere stukken"
+            return L["best_all_day_green"]
+        return L["best_all_day"]
 
     best = _best_precise_window_from_hours(day, ratio=0.92, min_len=2)
     if best:
         h0, h1, is_spike = best
         length = h1 - h0
         if is_spike:
-            return f"👉 Beste moment: kort piekje {h0:02d}–{h1:02d}u"
+            return L["best_spike"].format(h0=h0, h1=h1)
         if length >= 7:
-            return f"👉 Beste momenten: groot deel van de dag ({h0:02d}–{h1:02d}u)"
-        return f"👉 Beste moment: {h0:02d}–{h1:02d}u"
+            return L["best_big_part"].format(h0=h0, h1=h1)
+        return L["best_one"].format(h0=h0, h1=h1)
 
     clusters = day.get("clusters") or []
     if not clusters:
-        return "👉 Beste moment: geen duidelijk venster vandaag"
+        return L["best_none_today"]
 
     top = sorted(clusters, key=lambda c: (c["score"], (c["end"] - c["start"])), reverse=True)[0]
-    return f"👉 Beste moment: {top['start']:02d}–{top['end']:02d}u"
+    return L["best_one"].format(h0=top["start"], h1=top["end"])
+
+
+# =======================
+# Beste sessies over de hele horizon
+# =======================
+def _score_blocks(summary, profile=None, spot_name=None):
+    """
+    Aaneengesloten uurblokken per dag: (spot, date, start_uur, [scores], {uur: (golf, periode)}).
+    """
+    blocks = []
+    for day in summary:
+        pday = profile_day(day, profile)
+        hs = pday.get("hourly_scores") or {}
+        spot = spot_name or day.get("diag", {}).get("spot", SPOT["name"])
+        conditions = {c["h"]: (c["w"], c["t"]) for c in day.get("hourly_compact", [])}
+        hours = sorted(int(h) for h in hs)
+        start = 0
+        for i in range(1, len(hours) + 1):
+            if i == len(hours) or hours[i] != hours[i - 1] + 1:
+                block_hours = hours[start:i]
+                blocks.append((spot, day["date"], block_hours[0], [float(hs[h]) for h in block_hours], conditions))
+                start = i
+    return blocks
+
+
+def _window_conditions(conditions, start, end):
+    """
+    (energie, representatieve periode) over [start, end), zoals bij de dagdelen; None zonder data.
+    """
+    wt = [conditions[h] for h in range(start, end) if h in conditions]
+    if not wt:
+        return None, None
+    waves = [w for w, _ in wt]
+    periods = [t for _, t in wt]
+    return 0.49 * _mean(waves) ** 2 * _mean(periods), _median(periods)
+
+
+def _top_windows(blocks, k, min_len, max_len, min_score):
+    """
+    Prefix-sommen per blok geven elk venstergemiddelde in O(1). Een min-heap van
+    begrensde grootte houdt de beste kandidaten bij: O(n log k) voor vaste lengtes.
+    Eén gekozen venster sluit hooguit `per_pick` kandidaten uit (overlap), dus de
+    top k * per_pick bevat altijd k niet-overlappende sessies als die bestaan.
+    """
+    import heapq
+
+    n_lengths = max_len - min_len + 1
+    per_pick = n_lengths * (2 * max_len - 1)
+    cap = k * per_pick
+
+    heap = []
+    seq = 0
+    for b_idx, (_, _, _, scores, _) in enumerate(blocks):
+        prefix = [0.0]
+        for s in scores:
+            prefix.append(prefix[-1] + s)
+        n = len(scores)
+        for length in range(min_len, min(max_len, n) + 1):
+            for i in range(n - length + 1):
+                # afronden: prefix-verschillen mogen gelijke vensters niet door ruis ordenen
+                mean = round((prefix[i + length] - prefix[i]) / length, 9)
+                if mean < min_score:
+                    continue
+                # ranking: gemiddelde, dan langer, dan eerder
+                item = (mean, length, -seq, b_idx, i)
+                seq += 1
+                if len(heap) < cap:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+
+    picked = []
+    taken = {}
+    for mean, length, _, b_idx, i in sorted(heap, reverse=True):
+        span = (i, i + length)
+        if any(span[0] < e and s < span[1] for s, e in taken.get(b_idx, [])):
+            continue
+        taken.setdefault(b_idx, []).append(span)
+        spot, date, h_start, scores, conditions = blocks[b_idx]
+        energy, rep_per = _window_conditions(conditions, h_start + i, h_start + i + length)
+        picked.append({
+            "spot": spot,
+            "date": date,
+            "start": h_start + i,
+            "end": h_start + i + length,
+            "mean": mean,
+            "min": min(scores[i:i + length]),
+            "energy": energy,
+            "rep_per": rep_per,
+        })
+        if len(picked) >= k:
+            break
+    return picked
+
+
+def best_sessions(summary, k=5, min_len=2, max_len=None, profile=None, min_score=1.0):
+    """
+    Top-k niet-overlappende sessies van min_len..max_len uur over alle dagen in de
+    summary, gerangschikt op gemiddelde uurscore (bv. "beste 2 uur deze week").
+    """
+    max_len = max(max_len or min_len, min_len)
+    return _top_windows(_score_blocks(summary, profile), k, min_len, max_len, min_score)
+
+
+def best_sessions_multi(summaries_by_spot, k=5, min_len=2, max_len=None, profile=None, min_score=1.0):
+    """
+    Zelfde zoektocht over meerdere spots tegelijk: {spotnaam: summary}.
+    """
+    max_len = max(max_len or min_len, min_len)
+    blocks = []
+    for spot_name, summary in summaries_by_spot.items():
+        blocks.extend(_score_blocks(summary, profile, spot_name))
+    return _top_windows(blocks, k, min_len, max_len, min_score)
+
+
+def sessions_message(sessions, days, locale=DEFAULT_LOCALE, profile=None):
+    L = locale_texts(locale)
+    prof = resolve_profile(profile or DEFAULT_PROFILE)
+    lines = [L["sessions_title"].format(days=days)]
+    if not sessions:
+        lines.append(L["sessions_none"])
+    for s in sessions:
+        d = s["date"]
+        # zelfde regel als dag en dagdelen: score én energie, korte periode -> rood
+        color = color_from_score_energy(s["mean"], s.get("energy") or 0.0, prof)
+        if s.get("rep_per") is not None:
+            color = enforce_period_color(color, s["rep_per"])
+        lines.append(L["session_line"].format(
+            square=color_square(color), date=date_label(d, locale),
+            h0=s["start"], h1=s["end"], score=s["mean"],
+        ))
+    return "\n".join(lines)
 
 
 # =======================
@@ -737,7 +1808,9 @@ def pick_header_color(day):
     return day.get("color", "🟠")
 
 
-def why_tag(day):
+def why_tag(day, locale=DEFAULT_LOCALE):
+    L = locale_texts(locale)
+    why = L["why"]
     d = day.get("diag", {})
     wt = day.get("wind_type", "")
     wind = d.get("wind_med", None)
@@ -745,17 +1818,17 @@ def why_tag(day):
 
     bits = []
     if wt:
-        bits.append(wt)
+        bits.append(L["wind_types"].get(wt, wt))
     if wind is not None:
         if wind >= 30:
-            bits.append("veel wind")
+            bits.append(why["much_wind"])
         elif wind <= 10:
-            bits.append("weinig wind")
+            bits.append(why["little_wind"])
     if per is not None:
         if per < 6:
-            bits.append("korte periode")
+            bits.append(why["short_period"])
         elif per >= 8:
-            bits.append("lange periode")
+            bits.append(why["long_period"])
 
     bits = bits[:2]
     return " (" + " + ".join(bits) + ")" if bits else ""
@@ -776,14 +1849,17 @@ SYSTEM_COACH = (
 )
 
 
-def _sanitize_coach(text):
+def _sanitize_coach(text, locale=DEFAULT_LOCALE):
+    import re
+
     if not text:
         return ""
     t = text.strip()
     t = re.sub(r"\s+", " ", t)
     t = t.split("\n")[0].strip()
 
-    if re.search(r"\b(\d{1,2})\s*(u|uur)\b", t.lower()):
+    low = t.lower()
+    if any(re.search(pat, low) for pat in locale_texts(locale)["coach_guard"]["times"]):
         return ""
     if re.search(r"\b\d{1,2}[:.]\d{2}\b", t):
         return ""
@@ -793,15 +1869,21 @@ def _sanitize_coach(text):
     return t
 
 
-def _contains_heerlijk_surfen(text):
+def _contains_hype(text, locale=DEFAULT_LOCALE):
+    """
+    Groen-only superlatieven ("heerlijk surfen", "great surfing", ...) in de taal van het bericht.
+    """
+    import re
+
     if not text:
         return False
-    return re.search(r"\bheerlij\w*\s+surfen\b", text.lower()) is not None
+    low = text.lower()
+    return any(re.search(pat, low) for pat in locale_texts(locale)["coach_guard"]["hype"])
 
 
-def _ai_coach(day, purpose="today"):
+def _ai_coach(day, purpose="today", locale=DEFAULT_LOCALE):
     payload = {
-        "spot": SPOT["name"],
+        "spot": day.get("diag", {}).get("spot", SPOT["name"]),
         "stoplicht": day["color"],
         "header_hint": pick_header_color(day),
         "avg": {
@@ -835,29 +1917,34 @@ def _ai_coach(day, purpose="today"):
             "Vermijd 'hele dag goed' taal tenzij stoplicht groen is."
         )
 
-    body = json.dumps(
-        {
-            "model": MODEL_ID,
-            "messages": [
-                {"role": "system", "content": SYSTEM_COACH},
-                {"role": "user", "content": f"{instruction}\n\nData:\n{json.dumps(payload, ensure_ascii=False)}"},
-            ],
-            "temperature": 0.8,
-            "max_tokens": 95,
-        }
-    )
+    language = locale_texts(locale)["ai_language"]
+    if language:
+        instruction += f" Schrijf de zin in het {language}."
 
-    conn = http.client.HTTPSConnection("api.groq.com")
-    conn.request(
-        "POST",
-        "/openai/v1/chat/completions",
-        body,
-        {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"},
-    )
-    res = conn.getresponse()
-    raw = res.read().decode()
+    import json
 
-    if res.status != 200:
+    body = {
+        "model": MODEL_ID,
+        "messages": [
+            {"role": "system", "content": SYSTEM_COACH},
+            {"role": "user", "content": f"{instruction}\n\nData:\n{json.dumps(payload, ensure_ascii=False)}"},
+        ],
+        "temperature": 0.8,
+        "max_tokens": 95,
+    }
+
+    def attempt():
+        status, headers, raw = _http(
+            "POST", GROQ_URL, json_body=body, headers={"Authorization": f"Bearer {GROQ_API_KEY}"}, timeout=30
+        )
+        if status != 200:
+            raise HTTPStatusError(status, raw, _parse_retry_after(headers.get("Retry-After")))
+        return raw
+
+    try:
+        raw = _with_retries(GROQ_URL, attempt, retries=2, base_s=0.5, cap_s=3.0)
+    except RuntimeError:
+        # Groq traag/stuk of breaker open: lokale fallback-coach
         return ""
 
     try:
@@ -865,15 +1952,16 @@ def _ai_coach(day, purpose="today"):
     except Exception:
         return ""
 
-    txt = _sanitize_coach(txt)
+    txt = _sanitize_coach(txt, locale)
 
-    if txt and day.get("color") != "🟢" and _contains_heerlijk_surfen(txt):
+    if txt and day.get("color") != "🟢" and _contains_hype(txt, locale):
         return ""
 
     return txt
 
 
-def fallback_coach(day):
+def fallback_coach(day, locale=DEFAULT_LOCALE):
+    C = locale_texts(locale)["coach"]
     w = day["avg_wave"]
     t = day["avg_per"]
     wt = day.get("wind_type", "sideshore")
@@ -881,40 +1969,53 @@ def fallback_coach(day):
 
     if period_is_short(day.get("rep_per", t)):
         if wt == "onshore" and wind >= 12:
-            return "Korte periode en veel onshore, dus vooral chop en weinig lijn."
-        return "Korte periode, dus snel rommelig en weinig echte power."
+            return C["short_onshore"]
+        return C["short"]
 
     if w < 0.45:
-        return "Klein en weinig power, longboard is je beste kans."
+        return C["tiny"]
     if w < 0.7 and t <= 6:
-        return "Klein en kort, longboard of funboard werkt het lekkerst."
+        return C["small_short"]
     if wt == "onshore" and wind >= 18:
-        return "Hoogte zat, maar de wind drukt het snel plat; vooral werken voor je golven."
+        return C["onshore_flat"]
     if wt == "offshore" and wind <= 18 and t >= 6:
-        return "Wind helpt mee en de periode geeft ruimte, hier kun je lekker doorpakken."
-    return "Met wat geduld zitten er best bruikbare setjes tussen, al blijft het wisselend."
+        return C["offshore_good"]
+    return C["mixed"]
 
 
-def coach_line(day, purpose="today"):
+def coach_line(day, purpose="today", locale=DEFAULT_LOCALE):
+    spot = day.get("diag", {}).get("spot", SPOT["name"])
+    if COACH_MODE == "local" or (COACH_MODE == "auto" and spot != SPOT["name"]):
+        import coach_local
+
+        return coach_local.coach(day, purpose, locale)
     if not GROQ_API_KEY:
-        return fallback_coach(day)
-    txt = _ai_coach(day, purpose=purpose)
-    return txt if txt else fallback_coach(day)
+        return fallback_coach(day, locale)
+    txt = _ai_coach(day, purpose=purpose, locale=locale)
+    return txt if txt else fallback_coach(day, locale)
 
 
 # =======================
 # Bericht
 # =======================
-def build_message(summary):
+def build_message(summary, locale=DEFAULT_LOCALE, coach=None):
+    """
+    coach: optionele functie (day, purpose) -> zin; standaard coach_line in deze taal.
+    """
+    L = locale_texts(locale)
+    if coach is None:
+        def coach(day, purpose):
+            return coach_line(day, purpose, locale)
+
     today = summary[0]
     d = today["date"]
-    label = f"{DAGEN[d.weekday()]} {d.day} {MAANDEN[d.month-1]}"
+    label = date_label(d, locale)
 
     header_color = pick_header_color(today)
 
     lines = []
     lines.append(f"📅 {label}")
-    lines.append(f"{color_square(header_color)} {coach_line(today, 'today')}{why_tag(today)}")
+    lines.append(f"{color_square(header_color)} {coach(today, 'today')}{why_tag(today, locale)}")
     lines.append("")
 
     dp = today.get("dayparts") or {}
@@ -926,84 +2027,546 @@ def build_message(summary):
         h_txt = fmt_range(part["h_min"], part["h_max"], ndigits=1, unit="m")
         t_txt = fmt_period_band(part["t_min"], part["t_max"], unit="s", median=part.get("t_rep"))
         lines.append(
-            f"{part['color']} {name}: {h_txt} / {t_txt} ~{round(part['wind_avg'])} km/u {part['wind_type']}"
+            f"{part['color']} {L['dayparts'][name]}: {h_txt} / {t_txt} "
+            f"~{round(part['wind_avg'])} {L['speed_unit']} {L['wind_types'].get(part['wind_type'], part['wind_type'])}"
         )
 
     lines.append("")
-    lines.append(best_moments_line(today))
+    lines.append(best_moments_line(today, locale))
     lines.append("")
 
-    if len(summary) > 1:
-        t = summary[1]
-        phrase = natural_window_phrase(t)
-        if phrase == "vrijwel de hele dag" and t.get("color") != "🟢":
-            phrase = "door de dag heen (met dips)"
-        lines.append(
-            f"{color_square(t['color'])} Morgen: {coach_line(t, 'future')} "
-            f"Venster: {phrase}, met ~{t['avg_wave']:.1f} m en {round(t['avg_per'])} s swell."
-        )
-
-    if len(summary) > 2:
-        o = summary[2]
-        phrase = natural_window_phrase(o)
-        if phrase == "vrijwel de hele dag" and o.get("color") != "🟢":
-            phrase = "door de dag heen (met dips)"
-        lines.append(
-            f"{color_square(o['color'])} Overmorgen: {coach_line(o, 'future')} "
-            f"Venster: {phrase}, met ~{o['avg_wave']:.1f} m en {round(o['avg_per'])} s swell."
-        )
+    for idx, label_key in ((1, "tomorrow"), (2, "day_after")):
+        if len(summary) <= idx:
+            break
+        f = summary[idx]
+        phrase = natural_window_phrase(f, locale)
+        if phrase == L["all_day"] and f.get("color") != "🟢":
+            phrase = L["all_day_dips"]
+        window = L["future_line"].format(phrase=phrase, wave=f["avg_wave"], period=round(f["avg_per"]))
+        lines.append(f"{color_square(f['color'])} {L[label_key]}: {coach(f, 'future')} {window}")
 
     return "\n".join(lines)
 
 
+# =======================
+# Render-cache (render los van verzenden)
+# =======================
+# Sleutel: (spot, dagenset, profiel, taal). Eén render + één set coach-calls per sleutel,
+# ongeacht hoeveel abonnees hetzelfde bericht krijgen.
+_RENDER_CACHE = {}
+_COACH_CACHE = {}
+
+
+def clear_render_cache():
+    """Aan het begin van elke run (of refresh) aanroepen: nieuwe data = nieuwe renders."""
+    _RENDER_CACHE.clear()
+    _COACH_CACHE.clear()
+
+
+def render_key(summary, profile=DEFAULT_PROFILE, locale=DEFAULT_LOCALE):
+    spot = summary[0].get("diag", {}).get("spot", SPOT["name"]) if summary else SPOT["name"]
+    days = tuple(str(d["date"]) for d in summary)
+    return (spot, days, profile or DEFAULT_PROFILE, locale or DEFAULT_LOCALE)
+
+
+def _cached_coach(day, purpose, profile, locale):
+    key = (day.get("diag", {}).get("spot", SPOT["name"]), str(day["date"]), profile, purpose, locale)
+    if key not in _COACH_CACHE:
+        _COACH_CACHE[key] = coach_line(day, purpose, locale)
+    return _COACH_CACHE[key]
+
+
+def render_skeleton(summary, profile=DEFAULT_PROFILE, locale=DEFAULT_LOCALE):
+    """
+    Bericht zonder coachzinnen: zelfde zichtbare data, geen LLM-call.
+    Gebruikt om te bepalen of een refresh iets veranderd heeft; een andere
+    fallback-zin alleen telt dus niet als wijziging.
+    """
+    if not summary:
+        return locale_texts(locale)["no_data"]
+    return build_message(
+        profile_summary(summary, profile or DEFAULT_PROFILE),
+        locale=locale,
+        coach=lambda day, purpose: "",
+    )
+
+
+def message_hash(text):
+    import hashlib
+
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def render_message(summary, profile=DEFAULT_PROFILE, locale=DEFAULT_LOCALE):
+    profile = profile or DEFAULT_PROFILE
+    locale = locale or DEFAULT_LOCALE
+    key = render_key(summary, profile, locale)
+    msg = _RENDER_CACHE.get(key)
+    if msg is None:
+        if not summary:
+            msg = locale_texts(locale)["no_data"]
+        else:
+            msg = build_message(
+                profile_summary(summary, profile),
+                locale=locale,
+                coach=lambda day, purpose: _cached_coach(day, purpose, profile, locale),
+            )
+        _RENDER_CACHE[key] = msg
+    return msg
+
+
 # =======================
 # Telegram
 # =======================
-def send_telegram_message(text):
+def load_subscribers(path=None):
+    """
+    Abonnees uit een JSON-bestand (SURF_SUBSCRIBERS):
+    [{"chat_id": "...", "profile": "longboard"}, {"chat_id": "...", "profile": {"base": "beginner", ...}}]
+    Zonder bestand: één abonnee = TELEGRAM_CHAT_ID met het standaardprofiel.
+    """
+    path = path or SUBSCRIBERS_FILE
+    if path and os.path.exists(path):
+        import json
+        with open(path, encoding="utf-8") as f:
+            subs = json.load(f)
+        if not isinstance(subs, list):
+            raise RuntimeError(f"{path}: verwacht een lijst met abonnees.")
+        for sub in subs:
+            sub["profile"] = _checked_profile_spec(sub)
+        return subs
+    return [{"chat_id": TELEGRAM_CHAT_ID, "profile": DEFAULT_PROFILE}]
+
+
+def _checked_profile_spec(sub):
+    """
+    Profiel van één abonnee valideren bij het inladen. Een fout profiel kost alleen die
+    abonnee zijn eigen profiel (standaard + waarschuwing), niet de hele run.
+    """
+    spec = sub.get("profile", DEFAULT_PROFILE)
+    try:
+        if isinstance(spec, dict) and spec.get("name") in SCORING_PROFILES:
+            raise RuntimeError(f"naam {spec['name']!r} is een ingebouwd profiel; kies een andere naam.")
+        resolve_profile(spec)
+    except RuntimeError as e:
+        print(f"Profiel van {sub.get('chat_id')} ongeldig ({str(e)[:160]}); standaardprofiel gebruikt.")
+        return DEFAULT_PROFILE
+    return spec
+
+
+def render_for_subscribers(summary, subscribers, sub_profiles):
+    """
+    Render één keer per (spot, dagen, profiel, taal); geeft per abonnee het bericht terug.
+    """
+    return [
+        render_message(summary, profile, sub.get("locale", DEFAULT_LOCALE))
+        for sub, profile in zip(subscribers, sub_profiles)
+    ]
+
+
+def fan_out(subscribers, messages, send=None):
+    """
+    Verstuur per abonnee; geeft de Telegram message_ids terug (None bij mislukken).
+    """
+    send = send or send_telegram_message
+    ids = []
+    for sub, msg in zip(subscribers, messages):
+        try:
+            ids.append(send(msg, chat_id=sub.get("chat_id")))
+        except Exception as e:
+            print(f"Versturen naar {sub.get('chat_id')} mislukt: {str(e)[:220]}")
+            ids.append(None)
+    return ids
+
+
+def _telegram_call(method, payload):
+    """
+    POST naar de Bot API met het retry-beleid van api.telegram.org (429 -> retry_after).
+    send*-methodes zijn niet idempotent: zie _with_retries(idempotent=False).
+    Geeft (status, geparste body of ruwe tekst) terug voor niet-retrybare antwoorden.
+    """
+    import json
+
+    url = f"{TELEGRAM_API}/bot{TELEGRAM_TOKEN}/{method}"
+
+    def attempt():
+        status, headers, raw = _http("POST", url, json_body=payload, timeout=20)
+        try:
+            detail = json.loads(raw)
+        except Exception:
+            detail = raw.decode("utf-8", errors="replace") if isinstance(raw, bytes) else raw
+        if status != 200:
+            retry_after = _parse_retry_after(headers.get("Retry-After"))
+            if retry_after is None and isinstance(detail, dict):
+                retry_after = (detail.get("parameters") or {}).get("retry_after")
+            err = HTTPStatusError(status, detail, retry_after)
+            if err.retryable:
+                raise err
+        return status, detail
+
+    try:
+        return _with_retries(
+            url, attempt, retries=3, base_s=1.0, cap_s=8.0, label=f"Telegram {method}",
+            idempotent=not method.startswith("send"),
+        )
+    except HTTPStatusError as e:
+        return e.status, e.detail
+
+
+def send_telegram_message(text, chat_id=None):
+    chat_id = chat_id or TELEGRAM_CHAT_ID
     if not TELEGRAM_TOKEN:
         raise RuntimeError("TELEGRAM_TOKEN ontbreekt (env var leeg).")
-    if not TELEGRAM_CHAT_ID:
+    if not chat_id:
         raise RuntimeError("TELEGRAM_CHAT_ID ontbreekt (env var leeg).")
 
-    r = requests.post(
-        f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-        json={"chat_id": TELEGRAM_CHAT_ID, "text": text, "disable_web_page_preview": True},
-        timeout=20,
+    status, detail = _telegram_call(
+        "sendMessage", {"chat_id": chat_id, "text": text, "disable_web_page_preview": True}
     )
 
-    if r.status_code != 200:
-        try:
-            detail = r.json()
-        except Exception:
-            detail = r.text
-        raise RuntimeError(f"Telegram API error {r.status_code}: {detail}")
+    if status != 200:
+        raise RuntimeError(f"Telegram API error {status}: {detail}")
+
+    try:
+        return detail["result"]["message_id"]
+    except Exception:
+        return True
+
+
+def edit_telegram_message(text, message_id, chat_id=None):
+    chat_id = chat_id or TELEGRAM_CHAT_ID
+    if not TELEGRAM_TOKEN:
+        raise RuntimeError("TELEGRAM_TOKEN ontbreekt (env var leeg).")
+
+    status, detail = _telegram_call(
+        "editMessageText",
+        {"chat_id": chat_id, "message_id": message_id, "text": text, "disable_web_page_preview": True},
+    )
+
+    if status != 200:
+        # Zelfde tekst als al in de chat staat: niets te doen
+        if "message is not modified" in str(detail):
+            return True
+        raise RuntimeError(f"Telegram API error {status}: {detail}")
 
     return True
 
 
 # =======================
-# Main
+# Geschiedenis
 # =======================
-if __name__ == "__main__":
-    # Belangrijk:
-    # - Als je cron gebruikt: zet cron op 08:00 (Amsterdam). Dit is de echte fix voor 'drift'.
-    # - Als je script continu draait: dit zorgt dat hij om 08:00 (Amsterdam) verstuurt.
-    wait_until_send_time(SEND_AT_HOUR, SEND_AT_MINUTE)
+def save_history(spot, marine, wind, summary, run_time=None):
+    """
+    Geschiedenis is bijzaak: een kapotte of gelockte db mag de verzending niet blokkeren.
+    """
+    run_time = run_time or _tz_now_amsterdam().isoformat(timespec="minutes")
+    try:
+        import history
+
+        conn = history.connect()
+        try:
+            history.record_run(conn, spot["name"], run_time, marine, wind, summary)
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"Geschiedenis niet opgeslagen: {str(e)[:220]}")
+
 
+# =======================
+# Verzonden berichten (state voor refresh)
+# =======================
+def load_sent_state(path=None):
+    import json
+
+    path = path or SENT_STATE_FILE
     try:
-        marine, wind = get_open_meteo(SPOT["lat"], SPOT["lon"], days=2)
-        summary = summarize_forecast(marine, wind, days_out=3)
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_sent_state(state, path=None):
+    import json
+
+    path = path or SENT_STATE_FILE
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp, path)
 
-        if not summary:
-            message = "Geen surfdata beschikbaar vandaag."
-        else:
-            message = build_message(summary)
 
+def remember_sent(subscribers, messages, skeletons, message_ids, day=None):
+    """
+    Bewaar per chat het message_id en de hashes van vandaag; oudere dagen vervallen.
+    skeleton None = altijd bijwerken bij de volgende refresh (bv. na een foutmelding).
+    """
+    day = day or str(_tz_now_amsterdam().date())
+    sent = {}
+    for sub, msg, skel, mid in zip(subscribers, messages, skeletons, message_ids):
+        if mid is None or mid is True:
+            continue
+        sent[str(sub.get("chat_id"))] = {
+            "message_id": mid,
+            "hash": message_hash(msg),
+            "skeleton": message_hash(skel) if skel is not None else None,
+        }
+    save_sent_state({day: sent})
+
+
+# =======================
+# Runs
+# =======================
+def group_by_spot(subscribers):
+    """
+    [(spot, [abonnees])] in volgorde van eerste voorkomen; zonder "spot"-veld geldt SPOT.
+    """
+    groups = {}
+    for sub in subscribers:
+        spot = sub.get("spot") or SPOT
+        key = spot["name"]
+        if key not in groups:
+            groups[key] = (spot, [])
+        groups[key][1].append(sub)
+    return list(groups.values())
+
+
+def analyse(subscribers, spot=None):
+    spot = spot or SPOT
+    profiles, sub_profiles = active_profiles(subscribers)
+    marine, wind = fetch_forecast(spot, days=2)
+    summary = summarize_forecast(marine, wind, days_out=3, profiles=profiles, spot=spot)
+    if HISTORY_ENABLED:
+        save_history(spot, marine, wind, summary)
+    return summary, sub_profiles
+
+
+def analyse_spots(spots, days=2, days_out=3, profiles=None, workers=None):
+    """
+    Veel spots tegelijk: één bulk-fetch per endpoint (of per spot een delta-fetch als
+    SURF_DELTA=1), daarna de analyse per spot over een process pool op gedeeld
+    geheugen. Geeft {spotnaam: summary}.
+    """
+    import parallel
+
+    if DELTA_FETCH:
+        fetched = [fetch_forecast(spot, days=days) for spot in spots]
+    else:
+        fetched = get_open_meteo_bulk(spots, days=days)
+    summaries = parallel.summarize_many(
+        spots, fetched, days_out=days_out, profiles=profiles, workers=workers or WORKERS or None
+    )
+    if HISTORY_ENABLED:
+        for spot, (marine, wind), summary in zip(spots, fetched, summaries):
+            save_history(spot, marine, wind, summary)
+    return {spot["name"]: summary for spot, summary in zip(spots, summaries)}
+
+
+def analyse_groups(groups, parallel=None):
+    """
+    (summary, profielnaam per abonnee) per (spot, abonnees)-groep, of de Exception
+    voor die groep. parallel: alle spots in één batch via analyse_spots; faalt die,
+    dan krijgen alle groepen de fout. Default PARALLEL.
+    """
+    parallel = PARALLEL if parallel is None else parallel
+    if not parallel or len(groups) < 2:
+        results = []
+        for spot, subs in groups:
+            try:
+                results.append(analyse(subs, spot))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    try:
+        profiles, per_sub = active_profiles([sub for _, subs in groups for sub in subs])
+        summaries = analyse_spots([spot for spot, _ in groups], profiles=profiles)
     except Exception as e:
-        message = f"Surfbot: Open-Meteo tijdelijk traag/onbereikbaar. ({str(e)[:220]})"
+        return [e] * len(groups)
+    results = []
+    offset = 0
+    for spot, subs in groups:
+        results.append((summaries[spot["name"]], per_sub[offset:offset + len(subs)]))
+        offset += len(subs)
+    return results
+
+
+def run_daily():
+    subscribers = []
+    messages = []
+    skeletons = []
+    clear_render_cache()
+
+    # per spot, net als run_refresh: wie een eigen "spot" heeft krijgt die forecast
+    groups = group_by_spot(load_subscribers())
+    for (spot, subs), result in zip(groups, analyse_groups(groups)):
+        try:
+            if isinstance(result, Exception):
+                raise result
+            summary, sub_profiles = result
+            spot_messages = render_for_subscribers(summary, subs, sub_profiles)
+            spot_skeletons = [
+                render_skeleton(summary, profile, sub.get("locale", DEFAULT_LOCALE))
+                for sub, profile in zip(subs, sub_profiles)
+            ]
+        except Exception as e:
+            err = str(e)[:220]
+            spot_messages = [locale_texts(sub.get("locale"))["fetch_error"].format(err=err) for sub in subs]
+            spot_skeletons = [None] * len(subs)
+        subscribers += subs
+        messages += spot_messages
+        skeletons += spot_skeletons
+
+    for message in dict.fromkeys(messages):
+        print("----- SURF MESSAGE START -----")
+        print(message)
+        print("----- SURF MESSAGE END -----")
+
+    ids = fan_out(subscribers, messages)
+    remember_sent(subscribers, messages, skeletons, ids)
+
+    failed = ids.count(None)
+    if failed:
+        raise RuntimeError(f"{failed} van {len(ids)} berichten niet verstuurd.")
+
+
+def run_refresh():
+    """
+    Draai de pipeline opnieuw en werk het ochtendbericht in-place bij (editMessageText).
+    Alleen als de zichtbare tekst verandert: eerst een goedkope skeleton-render zonder
+    LLM vergelijken, pas bij verschil de volledige render + edit. Geeft #edits terug.
+    """
+    day = str(_tz_now_amsterdam().date())
+    state = load_sent_state()
+    sent = state.get(day) or {}
+    if not sent:
+        print("Refresh: nog geen ochtendbericht verstuurd vandaag.")
+        return 0
+
+    subscribers = [s for s in load_subscribers() if str(s.get("chat_id")) in sent]
+    clear_render_cache()
+    edits = 0
+    # per spot: de pipeline stuurt abonnees met een eigen "spot" de forecast van die spot
+    groups = group_by_spot(subscribers)
+    for (spot, subs), result in zip(groups, analyse_groups(groups)):
+        if isinstance(result, Exception):
+            # ochtendbericht laten staan; volgende refresh probeert opnieuw
+            print(f"Refresh {spot['name']} overgeslagen: {str(result)[:220]}")
+            continue
+        summary, sub_profiles = result
+        if not summary:
+            continue
 
-    print("----- SURF MESSAGE START -----")
+        skeleton_hashes = {}
+        for sub, profile in zip(subs, sub_profiles):
+            entry = sent[str(sub.get("chat_id"))]
+            locale = sub.get("locale", DEFAULT_LOCALE)
+            key = (profile, locale)
+            if key not in skeleton_hashes:
+                skeleton_hashes[key] = message_hash(render_skeleton(summary, profile, locale))
+            if skeleton_hashes[key] == entry.get("skeleton"):
+                continue
+
+            message = render_message(summary, profile, locale)
+            h = message_hash(message)
+            if h != entry.get("hash"):
+                try:
+                    edit_telegram_message(message, entry["message_id"], chat_id=sub.get("chat_id"))
+                except Exception as e:
+                    print(f"Bijwerken voor {sub.get('chat_id')} mislukt: {str(e)[:220]}")
+                    continue
+                edits += 1
+            entry["hash"] = h
+            entry["skeleton"] = skeleton_hashes[key]
+
+    save_sent_state({day: sent})
+    print(f"Refresh: {edits} bericht(en) bijgewerkt.")
+    return edits
+
+
+def run_sessions(min_len=2, days=7, k=5, chat_id=None, send=False):
+    """
+    "Beste sessies komende week" voor één abonnee (default de eerste): de top-k
+    vensters van min_len uur op zijn spot, met zijn profiel en in zijn taal.
+    Print het bericht; send=True stuurt het ook naar die chat.
+    """
+    subscribers = load_subscribers()
+    sub = next((s for s in subscribers if chat_id is None or str(s.get("chat_id")) == str(chat_id)), None)
+    if sub is None:
+        raise RuntimeError(f"Geen abonnee met chat_id {chat_id}.")
+    spot = sub.get("spot") or SPOT
+    profiles, (profile,) = active_profiles([sub])
+
+    marine, wind = fetch_forecast(spot, days=days - 1)
+    summary = summarize_forecast(marine, wind, days_out=days, profiles=profiles, spot=spot)
+    sessions = best_sessions(
+        summary, k=k, min_len=min_len, profile=profile, min_score=profiles[profile]["window_thr"]
+    )
+    message = sessions_message(
+        sessions, days, sub.get("locale", DEFAULT_LOCALE), sub.get("profile", DEFAULT_PROFILE)
+    )
     print(message)
-    print("----- SURF MESSAGE END -----")
+    if send:
+        send_telegram_message(message, chat_id=sub.get("chat_id"))
+    return message
+
+
+def refresh_loop(every_min=REFRESH_EVERY_MIN, until_hour=REFRESH_UNTIL_HOUR):
+    """
+    Voor continu draaien (systemd): elke every_min minuten een refresh tot until_hour.
+    """
+    while _tz_now_amsterdam().hour < until_hour:
+        run_refresh()
+        time.sleep(max(every_min, 1) * 60)
+
 
-    send_telegram_message(message)
+# =======================
+# Main
+# =======================
+if __name__ == "__main__":
+    # pipeline/parallel/profiling doen `import main`: laat dat deze module zijn, geen tweede kopie
+    sys.modules.setdefault("main", sys.modules[__name__])
+
+    if os.getenv("SURF_PROFILE", "0") == "1" or "--profile" in sys.argv:
+        import profiling
+
+        profiling.start(sys.modules[__name__])
+
+    if "--parallel" in sys.argv:
+        PARALLEL = True
+
+    mode = os.getenv("SURF_MODE", "daily")
+    if "--refresh" in sys.argv:
+        mode = "refresh"
+    elif "--refresh-loop" in sys.argv:
+        mode = "refresh-loop"
+    elif "--sessions" in sys.argv:
+        mode = "sessions"
+    elif "--pipeline" in sys.argv:
+        mode = "pipeline"
+
+    if mode == "refresh":
+        run_refresh()
+    elif mode == "refresh-loop":
+        refresh_loop()
+    elif mode == "sessions":
+        # python main.py --sessions [min_uren] [--chat <chat_id>] [--send]
+        rest = sys.argv[sys.argv.index("--sessions") + 1:] if "--sessions" in sys.argv else []
+        chat = sys.argv[sys.argv.index("--chat") + 1] if "--chat" in sys.argv[:-1] else None
+        run_sessions(
+            min_len=int(rest[0]) if rest and rest[0].isdigit() else 2,
+            chat_id=chat,
+            send="--send" in sys.argv,
+        )
+    elif mode == "pipeline":
+        # multi-spot: elke spot stroomt los door fetch -> analyse -> coach -> send
+        import pipeline
+
+        wait_until_send_time(SEND_AT_HOUR, SEND_AT_MINUTE)
+        pipeline.run_daily()
+    else:
+        # Belangrijk:
+        # - Als je cron gebruikt: zet cron op 08:00 (Amsterdam). Dit is de echte fix voor 'drift'.
+        # - Als je script continu draait: dit zorgt dat hij om 08:00 (Amsterdam) verstuurt.
+        wait_until_send_time(SEND_AT_HOUR, SEND_AT_MINUTE)
+        run_daily()
@@ -0,0 +1,228 @@
+"""
+Parallelle analyse van veel spots over een process pool.
+
+De gedecodeerde uurarrays van alle spots gaan één keer in twee blokken
+`multiprocessing.shared_memory`: getallen als float64 (NaN = null) in de vorm
+[spot][kolom][uur] en de tijdstempels als vaste 16-byte ASCII. Workers koppelen
+bij het opstarten aan die blokken en lezen hun spot via memoryview-slices
+(geen kopie, geen pickling van de payload). Per taak gaat alleen (index, lengte,
+spot) heen en de samenvatting per spot terug.
+
+    python parallel.py [spots] [workers]   # synthetische benchmark, 1 vs N workers
+"""
+import os
+import sys
+import math
+import time
+import array
+
+NAN = float("nan")
+TS_WIDTH = 16  # "YYYY-MM-DDTHH:MM"
+
+# (bron, Open-Meteo veld) in de volgorde van het gedeelde blok
+COLUMNS = (
+    ("marine", "wave_height"),
+    ("marine", "swell_wave_period"),
+    ("marine", "wave_period"),
+    ("marine", "swell_wave_peak_period"),
+    ("wind", "windspeed_10m"),
+    ("wind", "winddirection_10m"),
+)
+
+# per worker-proces gezet door _attach
+_W = {}
+
+
+# =======================
+# Inpakken (hoofdproces)
+# =======================
+def _as_doubles(values, n):
+    """
+    Open-Meteo kolom (lijst met None of array('d') met NaN) als array('d') van lengte n.
+    """
+    if isinstance(values, array.array) and values.typecode == "d":
+        out = values[:n]
+    else:
+        out = array.array("d", (NAN if v is None else v for v in values[:n]))
+    if len(out) < n:
+        out.extend([NAN] * (n - len(out)))
+    return out
+
+
+def pack(fetched):
+    """
+    [(marine, wind)] per spot -> (numeriek blok, tijdblok, n_max, lengtes per spot).
+    De aanroeper is eigenaar van beide blokken (close + unlink).
+    """
+    from multiprocessing import shared_memory
+
+    lengths = [len(m.get("hourly", {}).get("time", [])) for m, _ in fetched]
+    n_max = max(lengths, default=0) or 1
+    n_cols = len(COLUMNS)
+
+    nums = shared_memory.SharedMemory(create=True, size=8 * len(fetched) * n_cols * n_max)
+    times = shared_memory.SharedMemory(create=True, size=TS_WIDTH * len(fetched) * n_max)
+    try:
+        dst = nums.buf.cast("d")
+        for s, ((marine, wind), n) in enumerate(zip(fetched, lengths)):
+            src = {"marine": marine.get("hourly", {}), "wind": wind.get("hourly", {})}
+            for c, (kind, field) in enumerate(COLUMNS):
+                off = (s * n_cols + c) * n_max
+                dst[off:off + n] = _as_doubles(src[kind].get(field, []), n)
+
+            stamps = "".join(ts[:TS_WIDTH].ljust(TS_WIDTH) for ts in src["marine"].get("time", []))
+            off = s * n_max * TS_WIDTH
+            times.buf[off:off + len(stamps)] = stamps.encode("ascii")
+        dst.release()
+    except BaseException:
+        for block in (nums, times):
+            block.close()
+            block.unlink()
+        raise
+    return nums, times, n_max, lengths
+
+
+# =======================
+# Worker
+# =======================
+def _attach(nums_name, times_name, n_max, days_out, profiles):
+    from multiprocessing import shared_memory
+
+    _W["nums"] = shared_memory.SharedMemory(name=nums_name)
+    _W["times"] = shared_memory.SharedMemory(name=times_name)
+    _W["n_max"] = n_max
+    _W["days_out"] = days_out
+    _W["profiles"] = profiles
+
+
+def _analyse_one(task):
+    """
+    Eén spot: views op het gedeelde blok -> main.summarize_forecast.
+    """
+    import main
+
+    s, n, spot = task
+    n_max = _W["n_max"]
+    n_cols = len(COLUMNS)
+
+    off = s * n_max * TS_WIDTH
+    raw = bytes(_W["times"].buf[off:off + n * TS_WIDTH]).decode("ascii")
+    hrs = [raw[i:i + TS_WIDTH].rstrip() for i in range(0, len(raw), TS_WIDTH)]
+
+    flat = _W["nums"].buf.cast("d")
+    views = []
+    hourly = {"marine": {"time": hrs}, "wind": {}}
+    for c, (kind, field) in enumerate(COLUMNS):
+        off = (s * n_cols + c) * n_max
+        view = flat[off:off + n]
+        views.append(view)
+        hourly[kind][field] = view
+    try:
+        summary = main.summarize_forecast(
+            {"hourly": hourly["marine"]},
+            {"hourly": hourly["wind"]},
+            days_out=_W["days_out"],
+            profiles=_W["profiles"],
+            spot=spot,
+        )
+    finally:
+        for view in views:
+            view.release()
+        flat.release()
+    return s, summary
+
+
+# =======================
+# Publiek
+# =======================
+def default_workers():
+    return max(1, (os.cpu_count() or 1))
+
+
+def summarize_many(spots, fetched, days_out=3, profiles=None, workers=None):
+    """
+    Samenvatting per spot (zelfde volgorde als spots), over `workers` processen.
+    fetched: [(marine, wind)] per spot, bv. uit main.get_open_meteo_bulk.
+    Eén spot of workers=1: gewoon in dit proces, zonder pool.
+    """
+    import main
+
+    if len(spots) != len(fetched):
+        raise RuntimeError(f"{len(fetched)} forecasts voor {len(spots)} spots.")
+    workers = min(workers or default_workers(), len(spots))
+    if workers <= 1:
+        return [
+            main.summarize_forecast(marine, wind, days_out=days_out, profiles=profiles, spot=spot)
+            for spot, (marine, wind) in zip(spots, fetched)
+        ]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    nums, times, n_max, lengths = pack(fetched)
+    try:
+        tasks = [(s, n, spot) for s, (n, spot) in enumerate(zip(lengths, spots))]
+        out = [None] * len(spots)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_attach,
+            initargs=(nums.name, times.name, n_max, days_out, profiles),
+        ) as pool:
+            chunk = max(1, len(tasks) // (workers * 4))
+            for s, summary in pool.map(_analyse_one, tasks, chunksize=chunk):
+                out[s] = summary
+        return out
+    finally:
+        for block in (nums, times):
+            block.close()
+            block.unlink()
+
+
+# =======================
+# Benchmark
+# =======================
+def _synthetic(n_spots, days=7, seed=1):
+    """
+    Realistisch ogende Open-Meteo payloads (array('d')) voor n_spots.
+    """
+    import random
+    import datetime as dt
+
+    rnd = random.Random(seed)
+    start = dt.datetime.combine(dt.date.today(), dt.time())
+    hrs = [(start + dt.timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M") for i in range(24 * days)]
+    spots, fetched = [], []
+    for s in range(n_spots):
+        base_h = rnd.uniform(0.4, 1.8)
+        base_t = rnd.uniform(5.0, 10.0)
+        wave = array.array("d", (max(0.1, base_h + 0.4 * math.sin(i / 9.0 + s)) for i in range(len(hrs))))
+        per = array.array("d", (base_t + math.sin(i / 13.0) for i in range(len(hrs))))
+        wind_kmh = array.array("d", (abs(18 + 12 * math.sin(i / 7.0 + s)) for i in range(len(hrs))))
+        wind_dir = array.array("d", ((90 + 5 * i + 40 * s) % 360 for i in range(len(hrs))))
+        marine = {"hourly": {"time": hrs, "wave_height": wave, "swell_wave_period": per,
+                             "wave_period": per, "swell_wave_peak_period": per}}
+        wind = {"hourly": {"time": hrs, "windspeed_10m": wind_kmh, "winddirection_10m": wind_dir}}
+        spots.append({"name": f"spot-{s}", "lat": 52.0, "lon": 4.0})
+        fetched.append((marine, wind))
+    return spots, fetched
+
+
+def _bench(n_spots=200, workers=None):
+    workers = workers or default_workers()
+    spots, fetched = _synthetic(n_spots)
+    timings = {}
+    for w in sorted({1, workers}):
+        t0 = time.perf_counter()
+        summaries = summarize_many(spots, fetched, days_out=7, workers=w)
+        timings[w] = time.perf_counter() - t0
+        days = sum(len(s) for s in summaries)
+        print(f"{w:>2} worker(s): {n_spots} spots / {days} dagen in {timings[w]:.2f} s "
+              f"({n_spots / timings[w]:.0f} spots/s)")
+    if len(timings) > 1:
+        print(f"versnelling: {timings[1] / timings[workers]:.1f}x")
+
+
+if __name__ == "__main__":
+    _bench(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        int(sys.argv[2]) if len(sys.argv) > 2 else None,
+    )
@@ -0,0 +1,196 @@
+"""
+Gefaseerde asyncio-pipeline voor multi-spot runs.
+
+fetch -> analyse -> coach -> send, met begrensde queues tussen de fases en per
+fase een vast aantal workers. Elke spot stroomt los door zodra zijn forecast
+binnen is: één trage spot houdt de rest niet meer op, en de eerste berichten
+gaan weg terwijl andere spots nog downloaden. Volle queues remmen de fase
+ervoor af (backpressure). Het blokkerende werk (HTTP, analyse, LLM) draait
+per fase in een eigen ThreadPoolExecutor met STAGE_LIMITS threads; de gedeelde
+default executor van asyncio.to_thread zou die limieten niet afdwingen.
+
+Abonnees kiezen hun spot met een "spot"-veld ({"name", "lat", "lon"[, "tide"]});
+zonder dat veld geldt main.SPOT.
+"""
+import time
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import main
+
+# workers per fase
+STAGE_LIMITS = {"fetch": 8, "analyse": 2, "coach": 4, "send": 16}
+QUEUE_SIZE = 32
+
+_STOP = object()
+
+
+def _render(summary, subs, sub_profiles):
+    """
+    Berichten (render-cache) + skeletons, één skeleton per (profiel, taal).
+    """
+    messages = main.render_for_subscribers(summary, subs, sub_profiles)
+    cache = {}
+    skeletons = []
+    for sub, profile in zip(subs, sub_profiles):
+        key = (profile, sub.get("locale", main.DEFAULT_LOCALE))
+        if key not in cache:
+            cache[key] = main.render_skeleton(summary, *key)
+        skeletons.append(cache[key])
+    return messages, skeletons
+
+
+class _Run:
+    def __init__(self, days, days_out, limits, queue_size):
+        self.days = days
+        self.days_out = days_out
+        self.limits = dict(STAGE_LIMITS, **(limits or {}))
+        self.queues = {name: asyncio.Queue(maxsize=queue_size) for name in ("analyse", "coach", "send")}
+        self.results = []  # (abonnee, bericht, skeleton, message_id)
+        self.t0 = time.perf_counter()
+        self.first_sent_s = None
+        self.pools = {}
+
+    async def _call(self, stage, fn, *args):
+        """
+        Blokkerende fn in de executor van deze fase.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pools[stage], functools.partial(fn, *args))
+
+    # -----------------------
+    # Fases
+    # -----------------------
+    async def _worker(self, q, handle):
+        """
+        Eén worker: items uit q door handle. Een onverwachte fout kost alleen dat item,
+        nooit de worker; task_done volgt altijd, dus join() blijft niet hangen.
+        """
+        while True:
+            item = await q.get()
+            try:
+                if item is _STOP:
+                    return
+                await handle(item)
+            except Exception as e:
+                print(f"Pipeline: {handle.__name__} faalde: {str(e)[:220]}")
+            finally:
+                q.task_done()
+
+    async def fetch(self, job):
+        spot, subs = job
+        try:
+            marine, wind = await self._call("fetch", main.fetch_forecast, spot, self.days)
+        except Exception as e:
+            await self._fail(subs, e)
+            return
+        await self.queues["analyse"].put((spot, subs, marine, wind))
+
+    async def analyse(self, item):
+        spot, subs, marine, wind = item
+        try:
+            profiles, sub_profiles = main.active_profiles(subs)
+            summary = await self._call(
+                "analyse", main.summarize_forecast, marine, wind, self.days_out, profiles, spot
+            )
+            if main.HISTORY_ENABLED:
+                await self._call("analyse", main.save_history, spot, marine, wind, summary)
+        except Exception as e:
+            await self._fail(subs, e)
+            return
+        await self.queues["coach"].put((subs, summary, sub_profiles))
+
+    async def coach(self, item):
+        subs, summary, sub_profiles = item
+        try:
+            messages, skeletons = await self._call("coach", _render, summary, subs, sub_profiles)
+        except Exception as e:
+            await self._fail(subs, e)
+            return
+        for sub, message, skeleton in zip(subs, messages, skeletons):
+            await self.queues["send"].put((sub, message, skeleton))
+
+    async def send(self, item):
+        sub, message, skeleton = item
+        try:
+            mid = await self._call("send", main.send_telegram_message, message, sub.get("chat_id"))
+        except Exception as e:
+            print(f"Versturen naar {sub.get('chat_id')} mislukt: {str(e)[:220]}")
+            mid = None
+        if mid is not None and self.first_sent_s is None:
+            self.first_sent_s = time.perf_counter() - self.t0
+        self.results.append((sub, message, skeleton, mid))
+
+    async def _fail(self, subs, err):
+        """
+        Spot mislukt: die abonnees krijgen de foutmelding, de rest loopt gewoon door.
+        """
+        err = str(err)[:220]
+        for sub in subs:
+            message = main.locale_texts(sub.get("locale"))["fetch_error"].format(err=err)
+            await self.queues["send"].put((sub, message, None))
+
+    # -----------------------
+    # Aansturing
+    # -----------------------
+    async def run(self, groups):
+        self.pools = {
+            stage: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"surf-{stage}")
+            for stage, limit in self.limits.items()
+        }
+        try:
+            await self._run(groups)
+        finally:
+            for pool in self.pools.values():
+                pool.shutdown(wait=True)
+
+    async def _run(self, groups):
+        jobs = asyncio.Queue(maxsize=self.limits["fetch"])
+        workers = [asyncio.create_task(self._worker(jobs, self.fetch)) for _ in range(self.limits["fetch"])]
+        for stage in ("analyse", "coach", "send"):
+            workers += [
+                asyncio.create_task(self._worker(self.queues[stage], getattr(self, stage)))
+                for _ in range(self.limits[stage])
+            ]
+
+        for group in groups:
+            await jobs.put(group)
+        for _ in range(self.limits["fetch"]):
+            await jobs.put(_STOP)
+
+        # fases op volgorde leeg laten lopen; daarna zijn alle berichten verwerkt
+        await jobs.join()
+        for stage in ("analyse", "coach", "send"):
+            await self.queues[stage].join()
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+def run(subscribers, days=2, days_out=3, limits=None, queue_size=QUEUE_SIZE):
+    """
+    Draai de pipeline voor alle abonnees; geeft de run (results, first_sent_s) terug.
+    """
+    main.clear_render_cache()
+    r = _Run(days, days_out, limits, queue_size)
+    asyncio.run(r.run(main.group_by_spot(subscribers)))
+    return r
+
+
+def run_daily(subscribers=None):
+    """
+    Multi-spot tegenhanger van main.run_daily.
+    """
+    subscribers = subscribers if subscribers is not None else main.load_subscribers()
+    r = run(subscribers)
+    subs, messages, skeletons, ids = (list(col) for col in zip(*r.results)) if r.results else ([], [], [], [])
+    main.remember_sent(subs, messages, skeletons, ids)
+
+    elapsed = time.perf_counter() - r.t0
+    first = f"{r.first_sent_s:.1f} s" if r.first_sent_s is not None else "-"
+    print(f"Pipeline: {len(ids)} bericht(en) in {elapsed:.1f} s, eerste na {first}.")
+
+    failed = ids.count(None)
+    if failed:
+        raise RuntimeError(f"{failed} van {len(ids)} berichten niet verstuurd.")
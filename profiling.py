@@ -0,0 +1,210 @@
+"""
+Profiling op verzoek: SURF_PROFILE=1 of `python main.py --profile ...`.
+
+Tijdens de run:
+- cProfile op de hoofdthread (deterministisch, per functie),
+- een sampling-thread die elke SURF_PROFILE_INTERVAL_MS (default 5) de stacks van
+  alle threads noteert, ook die van de pipeline-executors en de retry-sleeps,
+- tracemalloc voor de grootste allocaties per regel.
+summarize_forecast, build_message en de netwerkfases (Open-Meteo, Groq,
+Telegram) worden omwikkeld: samples krijgen de fase als wortelframe en per
+fase worden aantal calls, tijd en geheugenpiek bijgehouden.
+
+Na afloop komt in SURF_PROFILE_DIR (default .surfalert/profiles) per run:
+    <run>.pstats       cProfile-dump (snakeviz, pstats)
+    <run>.collapsed    collapsed stacks: flamegraph.pl / speedscope / inferno
+    <run>.txt          fases, top-functies en top-allocaties
+"""
+import os
+import sys
+import time
+import atexit
+import threading
+import functools
+
+CACHE_DIR = os.getenv("SURF_CACHE_DIR", ".surfalert")
+OUT_DIR = os.getenv("SURF_PROFILE_DIR", os.path.join(CACHE_DIR, "profiles"))
+INTERVAL_MS = float(os.getenv("SURF_PROFILE_INTERVAL_MS", "5"))
+TOP_N = 25
+
+# main-attribuut -> fasenaam
+STAGES = {
+    "get_open_meteo": "fetch",
+    "get_open_meteo_bulk": "fetch",
+    "get_open_meteo_delta": "fetch",
+    "summarize_forecast": "analyse",
+    "build_message": "render",
+    "_ai_coach": "coach",
+    "_telegram_call": "send",
+}
+
+
+class Profiler:
+    def __init__(self, module, out_dir=OUT_DIR, interval_ms=INTERVAL_MS):
+        self.module = module
+        self.out_dir = out_dir
+        self.interval = max(interval_ms, 0.5) / 1000.0
+        self.run_id = time.strftime("%Y%m%d-%H%M%S")
+        self.stacks = {}
+        self.stage_of = {}  # thread-id -> lopende fase
+        self.stage_stats = {}  # fase -> [calls, seconden, piek bytes]
+        self._patched = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._cprofile = None
+        self._t0 = None
+        self._stopped = False
+
+    # -----------------------
+    # Fases omwikkelen
+    # -----------------------
+    def _wrap(self, fn, stage):
+        import tracemalloc
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            tid = threading.get_ident()
+            outer = self.stage_of.get(tid)
+            self.stage_of[tid] = stage
+            # piek per fase alleen zuiver te meten als er geen andere fase omheen loopt
+            if outer is None:
+                tracemalloc.reset_peak()
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - t0
+                peak = tracemalloc.get_traced_memory()[1] if outer is None else 0
+                if outer is None:
+                    self.stage_of.pop(tid, None)
+                else:
+                    self.stage_of[tid] = outer
+                with self._lock:
+                    st = self.stage_stats.setdefault(stage, [0, 0.0, 0])
+                    st[0] += 1
+                    st[1] += elapsed
+                    st[2] = max(st[2], peak)
+
+        return wrapper
+
+    def _patch(self):
+        for attr, stage in STAGES.items():
+            fn = getattr(self.module, attr, None)
+            if fn is not None:
+                self._patched[attr] = fn
+                setattr(self.module, attr, self._wrap(fn, stage))
+
+    def _unpatch(self):
+        for attr, fn in self._patched.items():
+            setattr(self.module, attr, fn)
+        self._patched.clear()
+
+    # -----------------------
+    # Sampling
+    # -----------------------
+    @staticmethod
+    def _frame_label(code):
+        mod = os.path.splitext(os.path.basename(code.co_filename))[0]
+        return f"{mod}:{code.co_name}"
+
+    def _sample_loop(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(self._frame_label(frame.f_code))
+                    frame = frame.f_back
+                stage = self.stage_of.get(tid)
+                if stage:
+                    labels.append(f"[{stage}]")
+                key = ";".join(reversed(labels))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    # -----------------------
+    # Start / stop
+    # -----------------------
+    def start(self):
+        import cProfile
+        import tracemalloc
+
+        tracemalloc.start(16)
+        self._patch()
+        self._cprofile = cProfile.Profile()
+        self._sampler = threading.Thread(target=self._sample_loop, name="surf-profiler", daemon=True)
+        self._t0 = time.perf_counter()
+        self._sampler.start()
+        self._cprofile.enable()
+        atexit.register(self.stop)
+        return self
+
+    def stop(self):
+        """
+        Idempotent; schrijft de rapporten en geeft het pad-prefix terug.
+        """
+        import tracemalloc
+
+        if self._stopped:
+            return None
+        self._stopped = True
+        self._cprofile.disable()
+        self._stop.set()
+        self._sampler.join(timeout=2)
+        self._unpatch()
+        elapsed = time.perf_counter() - self._t0
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        prefix = os.path.join(self.out_dir, self.run_id)
+        self._cprofile.dump_stats(prefix + ".pstats")
+        with open(prefix + ".collapsed", "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        with open(prefix + ".txt", "w", encoding="utf-8") as f:
+            f.write(self._report(elapsed, peak, snapshot))
+        print(f"Profiel geschreven: {prefix}.{{pstats,collapsed,txt}}")
+        return prefix
+
+    # -----------------------
+    # Rapport
+    # -----------------------
+    def _report(self, elapsed, peak, snapshot):
+        import io
+        import pstats
+        import tracemalloc
+
+        lines = [f"Run {self.run_id}: {elapsed:.2f} s, tracemalloc-piek {peak / 1e6:.1f} MB, "
+                 f"{sum(self.stacks.values())} samples à {self.interval * 1000:.0f} ms", ""]
+
+        lines.append("Fases (calls, totaal, gemiddeld, geheugenpiek):")
+        for stage, (calls, secs, stage_peak) in sorted(self.stage_stats.items(), key=lambda kv: -kv[1][1]):
+            lines.append(f"  {stage:<8} {calls:>6}x  {secs:8.3f} s  {secs / calls * 1000:8.1f} ms  "
+                         f"{stage_peak / 1e6:6.1f} MB")
+
+        lines += ["", f"Top {TOP_N} functies (cProfile, cumulatief, hoofdthread):"]
+        buf = io.StringIO()
+        pstats.Stats(self._cprofile, stream=buf).sort_stats("cumulative").print_stats(TOP_N)
+        lines += ["  " + ln for ln in buf.getvalue().splitlines() if ln.strip()]
+
+        lines += ["", f"Top {TOP_N} allocaties (nog levend bij afsluiten, per regel):"]
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        for stat in snapshot.statistics("lineno")[:TOP_N]:
+            frame = stat.traceback[0]
+            lines.append(f"  {stat.size / 1024:9.1f} KiB  {stat.count:>7}x  {frame.filename}:{frame.lineno}")
+        return "\n".join(lines) + "\n"
+
+
+def start(module):
+    """
+    Start profiling voor de rest van het proces; rapporten volgen bij stop() of exit.
+    """
+    return Profiler(module).start()
@@ -0,0 +1,223 @@
+"""
+Streaming JSON-decoder voor (bulk) Open-Meteo responses.
+
+Bytes worden per chunk verwerkt terwijl ze binnenkomen. Numerieke arrays onder
+"hourly" (en "minutely_15") gaan direct in array('d'), met NaN als masker voor
+null. Zo ontstaan er geen tussenliggende lijsten met Python-floats. Strings,
+zoals "time", blijven gewone lijsten. De rest van het document (metadata,
+units, ...) wordt normaal opgebouwd. Een multi-location response (top-level
+lijst) levert een lijst met één dict per locatie op.
+"""
+import re
+import json
+import array
+import codecs
+
+TYPED_PARENTS = ("hourly", "minutely_15")
+
+NAN = float("nan")
+
+_WS = re.compile(r"\s*")
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_NUM_RUN = re.compile(r"(?:(?:-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?|null)\s*,\s*)+")
+_NUM_TAIL = re.compile(r"[0-9.eE+-]*")
+_STRING = re.compile(r'"((?:[^"\\]|\\.)*)"', re.DOTALL)
+_LITERALS = {"null": None, "true": True, "false": False}
+
+# wat er binnen een container verwacht wordt
+_VALUE_OR_END, _VALUE, _SEP, _KEY_OR_END, _KEY, _COLON = range(6)
+
+
+class StreamDecoder:
+    """
+    feed(bytes) zo vaak als nodig, daarna close() -> het gedecodeerde document.
+    """
+
+    def __init__(self, typed_parents=TYPED_PARENTS):
+        self.typed_parents = set(typed_parents)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        # stack van [container, key_of_None, verwacht]; key = laatst gelezen objectsleutel,
+        # verwacht = wat er volgens de grammatica nu mag komen (_KEY_OR_END, _COLON, ...)
+        self._stack = []
+        self._root = None
+        self._done = False
+
+    # -----------------------
+    # Invoer
+    # -----------------------
+    def feed(self, chunk):
+        self._buf = self._buf[self._pos:] + self._utf8.decode(chunk)
+        self._pos = 0
+        self._parse(final=False)
+
+    def close(self):
+        self._buf = self._buf[self._pos:] + self._utf8.decode(b"", final=True)
+        self._pos = 0
+        self._parse(final=True)
+        if not self._done:
+            raise ValueError("JSON onvolledig: stream eindigde midden in het document")
+        return self._root
+
+    # -----------------------
+    # Parser
+    # -----------------------
+    def _new_array(self):
+        """
+        Array direct onder een typed parent (bv. hourly.wave_height) -> array('d').
+        """
+        if self._stack:
+            parent, key, _ = self._stack[-1]
+            if isinstance(parent, dict) and key != "time" and self._parent_name() in self.typed_parents:
+                return array.array("d")
+        return []
+
+    def _parent_name(self):
+        # sleutel waaronder het huidige object hangt
+        if len(self._stack) < 2:
+            return None
+        return self._stack[-2][1]
+
+    def _expect_value(self, pos):
+        """
+        Er begint een waarde op pos; mag dat hier? Zet de container daarna op 'scheidingsteken'.
+        """
+        if not self._stack:
+            if self._done:
+                raise ValueError(f"Extra data na JSON-document op positie {pos}")
+            return
+        top = self._stack[-1]
+        if top[2] not in (_VALUE, _VALUE_OR_END):
+            raise ValueError(f"Ontbrekend scheidingsteken vóór positie {pos}")
+        top[2] = _SEP
+
+    def _emit(self, value):
+        if not self._stack:
+            self._root = value
+            self._done = True
+            return
+        top = self._stack[-1]
+        container = top[0]
+        if isinstance(container, dict):
+            container[top[1]] = value
+        elif isinstance(container, array.array):
+            if value is None:
+                container.append(NAN)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                container.append(value)
+            else:
+                # onverwacht geen getal: terug naar een gewone lijst
+                as_list = [None if v != v else v for v in container]
+                as_list.append(value)
+                top[0] = as_list
+                self._replace_in_parent(container, as_list)
+        else:
+            container.append(value)
+
+    def _replace_in_parent(self, old, new):
+        if len(self._stack) >= 2:
+            parent = self._stack[-2]
+            if isinstance(parent[0], dict):
+                parent[0][parent[1]] = new
+
+    def _parse(self, final):
+        buf = self._buf
+        n = len(buf)
+        pos = self._pos
+        ws = _WS.match
+        while True:
+            pos = ws(buf, pos).end()
+            if pos >= n:
+                break
+            c = buf[pos]
+            top = self._stack[-1] if self._stack else None
+
+            if c == "{" or c == "[":
+                self._expect_value(pos)
+                container = {} if c == "{" else self._new_array()
+                if top is not None and isinstance(top[0], dict):
+                    top[0][top[1]] = container
+                elif top is not None:
+                    top[0].append(container)
+                self._stack.append([container, None, _KEY_OR_END if c == "{" else _VALUE_OR_END])
+                pos += 1
+            elif c == "}" or c == "]":
+                if top is None or isinstance(top[0], dict) != (c == "}"):
+                    raise ValueError(f"Onverwacht teken {c!r} op positie {pos}")
+                if top[2] not in (_SEP, _KEY_OR_END, _VALUE_OR_END):
+                    raise ValueError(f"Waarde of sleutel verwacht vóór {c!r} op positie {pos}")
+                container = self._stack.pop()[0]
+                pos += 1
+                if not self._stack:
+                    self._root = container
+                    self._done = True
+            elif c == ",":
+                if top is None or top[2] != _SEP:
+                    raise ValueError(f"Onverwachte ',' op positie {pos}")
+                top[2] = _KEY if isinstance(top[0], dict) else _VALUE
+                pos += 1
+            elif c == ":":
+                if top is None or top[2] != _COLON:
+                    raise ValueError(f"Onverwachte ':' op positie {pos}")
+                top[2] = _VALUE
+                pos += 1
+            elif c == '"':
+                m = _STRING.match(buf, pos)
+                if m is None:
+                    if final:
+                        raise ValueError(f"Onafgesloten string op positie {pos}")
+                    break
+                raw = m.group(1)
+                s = json.loads(m.group(0)) if "\\" in raw else raw
+                if top is not None and top[2] in (_KEY_OR_END, _KEY):
+                    top[1] = s
+                    top[2] = _COLON
+                else:
+                    self._expect_value(pos)
+                    self._emit(s)
+                pos = m.end()
+            else:
+                # snelle route: reeks "getal|null," in een typed array in één keer
+                if top is not None and type(top[0]) is array.array and top[2] != _SEP:
+                    m = _NUM_RUN.match(buf, pos)
+                    if m is not None:
+                        arr = top[0]
+                        for tok in m.group(0).split(","):
+                            tok = tok.strip()
+                            if tok:
+                                arr.append(NAN if tok == "null" else float(tok))
+                        top[2] = _VALUE
+                        pos = m.end()
+                        continue
+
+                m = _NUMBER.match(buf, pos)
+                if m is not None:
+                    # getal kan nog doorlopen in de volgende chunk ("1." / "1e" aan het eind)
+                    if not final and _NUM_TAIL.fullmatch(buf, m.end()) is not None:
+                        break
+                    tok = m.group(0)
+                    is_float = "." in tok or "e" in tok or "E" in tok
+                    self._expect_value(pos)
+                    self._emit(float(tok) if is_float else int(tok))
+                    pos = m.end()
+                    continue
+                for lit, val in _LITERALS.items():
+                    if buf.startswith(lit, pos):
+                        self._expect_value(pos)
+                        self._emit(val)
+                        pos += len(lit)
+                        break
+                else:
+                    if not final and n - pos < 5:
+                        break
+                    raise ValueError(f"Onverwacht teken {c!r} op positie {pos}")
+        self._pos = pos
+
+
+def decode_chunks(chunks, typed_parents=TYPED_PARENTS):
+    dec = StreamDecoder(typed_parents)
+    for chunk in chunks:
+        if chunk:
+            dec.feed(chunk)
+    return dec.close()
@@ -0,0 +1,22 @@
+import math
+import datetime as dt
+
+import main
+
+
+def synthetic_forecast(spot, days=2):
+    """
+    Synthetische Open-Meteo payload vanaf vandaag, per spot anders.
+    """
+    d0 = dt.datetime.combine(main._tz_now_amsterdam().date(), dt.time())
+    n = 24 * (days + 1)
+    phase = 0.0 if spot["name"] == main.SPOT["name"] else 2.0
+    hrs = [(d0 + dt.timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M") for i in range(n)]
+    wave = [round(0.9 + 0.6 * math.sin(i / 9.0 + phase), 2) for i in range(n)]
+    per = [round(7.0 + 2 * math.sin(i / 13.0 + phase), 1) for i in range(n)]
+    marine = {"hourly": {"time": hrs, "wave_height": wave, "swell_wave_period": per,
+                         "wave_period": per, "swell_wave_peak_period": per}}
+    wind = {"hourly": {"time": hrs,
+                       "windspeed_10m": [round(10 + 15 * abs(math.sin(i / 17.0 + phase)), 1) for i in range(n)],
+                       "winddirection_10m": [round((i * 7.3 + 90 * phase) % 360) for i in range(n)]}}
+    return marine, wind
@@ -0,0 +1,48 @@
+import pytest
+
+import main
+from conftest import synthetic_forecast
+
+OWN_SPOT = {"name": "spot-2", "lat": 53.2, "lon": 4.7, "tide": None}
+
+
+@pytest.fixture(params=[False, True], ids=["serieel", "parallel"])
+def bot(request, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "SENT_STATE_FILE", str(tmp_path / "sent.json"))
+    monkeypatch.setattr(main, "HISTORY_ENABLED", False)
+    monkeypatch.setattr(main, "TIDE_ENABLED", False)
+    monkeypatch.setattr(main, "GROQ_API_KEY", None)
+    monkeypatch.setattr(main, "fetch_forecast", synthetic_forecast)
+    monkeypatch.setattr(main, "get_open_meteo_bulk", lambda spots, days=2: [synthetic_forecast(s, days) for s in spots])
+    monkeypatch.setattr(main, "PARALLEL", request.param)
+    monkeypatch.setattr(main, "WORKERS", 2)
+
+    subs = [{"chat_id": "1"}, {"chat_id": "2", "spot": OWN_SPOT, "locale": "en"}]
+    monkeypatch.setattr(main, "load_subscribers", lambda path=None: [dict(s) for s in subs])
+
+    sent, edits = {}, []
+
+    def send(text, chat_id=None):
+        sent[chat_id] = text
+        return len(sent)
+
+    monkeypatch.setattr(main, "send_telegram_message", send)
+    monkeypatch.setattr(main, "edit_telegram_message", lambda text, mid, chat_id=None: edits.append(chat_id))
+    return sent, edits
+
+
+def test_daily_sends_each_subscriber_their_own_spot(bot):
+    sent, _ = bot
+    main.run_daily()
+
+    main.clear_render_cache()
+    own, _ = main.analyse([{"chat_id": "2"}], OWN_SPOT)
+    assert sent["2"] == main.render_message(own, main.DEFAULT_PROFILE, "en")
+    assert sent["1"] != sent["2"]
+
+
+def test_refresh_after_daily_makes_no_edit_when_data_is_unchanged(bot):
+    _, edits = bot
+    main.run_daily()
+    assert main.run_refresh() == 0
+    assert edits == []
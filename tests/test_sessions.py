@@ -0,0 +1,101 @@
+import random
+import datetime as dt
+
+import pytest
+
+import main
+from conftest import synthetic_forecast
+
+
+def _blocks(rnd):
+    blocks = []
+    day = dt.date(2026, 10, 19)
+    for b in range(rnd.randint(1, 6)):
+        start = rnd.randint(6, 12)
+        # weinig verschillende waarden: veel gelijke gemiddelden, dus de tie-break telt mee
+        scores = [rnd.choice([0.5, 1.0, 1.5, 2.0, 2.5, 3.0, rnd.uniform(0, 3)]) for _ in range(rnd.randint(1, 14))]
+        blocks.append((f"spot-{b % 2}", day + dt.timedelta(days=b), start, scores, {}))
+    return blocks
+
+
+def _brute_force(blocks, k, min_len, max_len, min_score):
+    """
+    Alle vensters, volledig gesorteerd, dan gretig niet-overlappend kiezen.
+    """
+    candidates = []
+    seq = 0
+    for b_idx, (_, _, _, scores, _) in enumerate(blocks):
+        n = len(scores)
+        for length in range(min_len, min(max_len, n) + 1):
+            for i in range(n - length + 1):
+                mean = round(sum(scores[i:i + length]) / length, 9)
+                if mean < min_score:
+                    continue
+                candidates.append((mean, length, -seq, b_idx, i))
+                seq += 1
+    picked = []
+    for mean, length, _, b_idx, i in sorted(candidates, reverse=True):
+        if any(p[0] == b_idx and i < p[1] + p[2] and p[1] < i + length for p in picked):
+            continue
+        picked.append((b_idx, i, length))
+        if len(picked) >= k:
+            break
+    return [(blocks[b][1], blocks[b][2] + i, blocks[b][2] + i + length) for b, i, length in picked]
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_top_windows_matches_brute_force(seed):
+    rnd = random.Random(seed)
+    blocks = _blocks(rnd)
+    k = rnd.randint(1, 6)
+    min_len = rnd.randint(1, 3)
+    max_len = min_len + rnd.randint(0, 3)
+    min_score = rnd.choice([0.0, 1.0, 2.0])
+
+    got = main._top_windows(blocks, k, min_len, max_len, min_score)
+    assert [(s["date"], s["start"], s["end"]) for s in got] == _brute_force(blocks, k, min_len, max_len, min_score)
+
+
+def _session(mean, energy, rep_per=9.0):
+    return {"spot": "x", "date": dt.date(2026, 10, 19), "start": 9, "end": 11, "mean": mean, "min": mean,
+            "energy": energy, "rep_per": rep_per}
+
+
+def test_session_colour_follows_day_rule():
+    prof = main.SCORING_PROFILES[main.DEFAULT_PROFILE]
+    high = prof["green_score"] + 0.5
+
+    green = main.sessions_message([_session(high, prof["green_energy"] + 1)], 3)
+    weak = main.sessions_message([_session(high, prof["green_energy"] / 2)], 3)
+    short = main.sessions_message([_session(high, prof["green_energy"] + 1, rep_per=4.0)], 3)
+
+    assert "🟩" in green
+    assert "🟧" in weak and "🟩" not in weak
+    assert "🟥" in short
+
+
+def test_run_sessions_uses_the_subscribers_spot_profile_and_locale(monkeypatch):
+    spot = {"name": "spot-2", "lat": 53.2, "lon": 4.7, "tide": None}
+    sub = {"chat_id": "7", "spot": spot, "profile": "longboard", "locale": "en"}
+    fetched = []
+
+    def fetch(s, days=2):
+        fetched.append(s["name"])
+        return synthetic_forecast(s, days)
+
+    monkeypatch.setattr(main, "TIDE_ENABLED", False)
+    monkeypatch.setattr(main, "fetch_forecast", fetch)
+    monkeypatch.setattr(main, "load_subscribers", lambda path=None: [{"chat_id": "1"}, sub])
+    sent = []
+    monkeypatch.setattr(main, "send_telegram_message", lambda text, chat_id=None: sent.append(chat_id))
+
+    message = main.run_sessions(min_len=2, days=3, chat_id="7", send=True)
+
+    profiles, _ = main.active_profiles([sub])
+    summary = main.summarize_forecast(*synthetic_forecast(spot, 2), days_out=3, profiles=profiles, spot=spot)
+    expected = main.best_sessions(summary, k=5, min_len=2, profile="longboard",
+                                  min_score=main.SCORING_PROFILES["longboard"]["window_thr"])
+    assert fetched == ["spot-2"]
+    assert sent == ["7"]
+    assert message == main.sessions_message(expected, 3, "en", "longboard")
+    assert message.startswith(main.LOCALES["en"]["sessions_title"].format(days=3))
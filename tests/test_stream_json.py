@@ -0,0 +1,89 @@
+import json
+import array
+import random
+
+import pytest
+
+import stream_json
+
+
+def _plain(value):
+    """
+    Decoder-uitvoer vergelijkbaar maken met json.loads: array('d') -> lijst, NaN -> None.
+    """
+    if isinstance(value, array.array):
+        return [None if v != v else v for v in value]
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    return value
+
+
+def _chunks(data, rnd, max_size):
+    pos = 0
+    while pos < len(data):
+        size = rnd.randint(1, max_size)
+        yield data[pos:pos + size]
+        pos += size
+
+
+def _open_meteo_doc(rnd, hours=72):
+    return {
+        "latitude": 52.1,
+        "longitude": 4.25,
+        "timezone": "Europe/Amsterdam",
+        "hourly_units": {"time": "iso8601", "wave_height": "m"},
+        "hourly": {
+            "time": [f"2026-10-{19 + h // 24:02d}T{h % 24:02d}:00" for h in range(hours)],
+            "wave_height": [None if rnd.random() < 0.1 else round(rnd.uniform(0, 3), 2) for _ in range(hours)],
+            "wave_period": [rnd.randint(3, 14) for _ in range(hours)],
+            "winddirection_10m": [rnd.uniform(-1e3, 1e3) for _ in range(hours)],
+        },
+        "flags": [True, False, None, "tekst met \"quotes\" en é", -0.5e-3, {}],
+    }
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_matches_json_loads_on_random_chunking(seed):
+    rnd = random.Random(seed)
+    doc = [_open_meteo_doc(rnd) for _ in range(rnd.randint(1, 3))]
+    separators = rnd.choice([(",", ":"), (", ", ": ")])
+    data = json.dumps(doc, ensure_ascii=rnd.random() < 0.5, separators=separators,
+                      indent=rnd.choice([None, 2])).encode("utf-8")
+
+    got = stream_json.decode_chunks(_chunks(data, rnd, rnd.choice([1, 7, 64, 4096])))
+    assert _plain(got) == json.loads(data)
+
+
+def test_hourly_numbers_become_typed_arrays():
+    data = json.dumps({"hourly": {"time": ["2026-10-19T00:00"], "wave_height": [1.5, None]}}).encode()
+    got = stream_json.decode_chunks([data])
+    assert isinstance(got["hourly"]["wave_height"], array.array)
+    assert isinstance(got["hourly"]["time"], list)
+
+
+@pytest.mark.parametrize("text", [
+    '{"a" 1}',
+    '{"a": 1 "b": 2}',
+    '[1 2 3]',
+    '[1, 2 3]',
+    '{"hourly": {"wave_height": [1.0 2.0]}}',
+    '{"hourly": {"wave_height": [1.0, 2.0,]}}',
+    '[1,]',
+    '[,1]',
+    '{"a":}',
+    '{,"a": 1}',
+    '{"a": 1,}',
+    '[1}',
+    '{"a": 1]',
+    '["a" "b"]',
+    '{"a": 1} 2',
+    '{"a": [1, 2}',
+])
+def test_rejects_invalid_json(text):
+    with pytest.raises(ValueError):
+        json.loads(text)
+    for size in (1, 3, len(text)):
+        with pytest.raises(ValueError):
+            stream_json.decode_chunks(_chunks(text.encode(), random.Random(size), size))
@@ -0,0 +1,286 @@
+"""
+Lokaal getij uit harmonische constituenten (geen netwerk).
+
+Per station en jaar wordt één tabel op 10-minuten-resolutie voorgerekend en als
+compact binair bestand gecachet (int16 waterstand in cm + uint8 getijfase).
+Tijdens de dagelijkse run is elke opvraging een O(1) index-read in die tabel,
+geen harmonische som.
+"""
+import os
+import math
+import array
+import struct
+import datetime as dt
+
+CACHE_DIR = os.getenv("SURF_CACHE_DIR", ".surfalert")
+STEP_MIN = 10
+
+_MAGIC = b"TIDE"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHI")  # magic, versie, stap (min), aantal samples
+
+# Doodson-getallen (tau, s, h, p, N', p1) + extra fase in graden
+_DOODSON = {
+    "M2": ((2, 0, 0, 0, 0, 0), 0),
+    "S2": ((2, 2, -2, 0, 0, 0), 0),
+    "N2": ((2, -1, 0, 1, 0, 0), 0),
+    "K2": ((2, 2, 0, 0, 0, 0), 0),
+    "K1": ((1, 1, 0, 0, 0, 0), 90),
+    "O1": ((1, -1, 0, 0, 0, 0), -90),
+    "P1": ((1, 1, -2, 0, 0, 0), -90),
+    "M4": ((4, 0, 0, 0, 0, 0), 0),
+    "MS4": ((4, 2, -2, 0, 0, 0), 0),
+    "MN4": ((4, -1, 0, 1, 0, 0), 0),
+}
+
+# Stations: amplitude (m) en fase g (graden, t.o.v. UTC) per constituent.
+# Benaderde waarden voor de Hollandse kust; kalibreer tegen de RWS-getijtafels als
+# precisie op minuten belangrijk wordt. z0 = gemiddeld niveau t.o.v. NAP (m).
+STATIONS = {
+    "scheveningen": {
+        "z0": 0.05,
+        "constituents": {
+            "M2": (0.75, 65.0),
+            "S2": (0.18, 125.0),
+            "N2": (0.12, 45.0),
+            "K2": (0.05, 125.0),
+            "K1": (0.08, 190.0),
+            "O1": (0.10, 30.0),
+            "P1": (0.03, 185.0),
+            "M4": (0.13, 110.0),
+            "MS4": (0.08, 170.0),
+            "MN4": (0.05, 90.0),
+        },
+    },
+}
+
+_TABLES = {}
+
+
+# =======================
+# Astronomie
+# =======================
+def _astro_args(t_utc):
+    """
+    Middelbare lengtes (graden) op tijdstip t_utc: tau, s, h, p, N', p1.
+    """
+    j2000 = dt.datetime(2000, 1, 1, 12, tzinfo=dt.timezone.utc)
+    d = (t_utc - j2000).total_seconds() / 86400.0
+    s = 218.3164591 + 13.17639648 * d
+    h = 280.4664567 + 0.98564736 * d
+    p = 83.3532430 + 0.11140353 * d
+    n = 125.0445550 - 0.05295377 * d
+    p1 = 282.9373 + 0.00004708 * d
+    hours = t_utc.hour + t_utc.minute / 60.0 + t_utc.second / 3600.0
+    tau = 15.0 * hours + 180.0 + h - s
+    return (tau, s, h, p, -n, p1)
+
+
+def _nodal(name, n_deg):
+    """
+    Knoopcorrecties (f, u) volgens de gangbare benadering van Schureman.
+    """
+    c = math.cos(math.radians(n_deg))
+    sn = math.sin(math.radians(n_deg))
+    f_m2, u_m2 = 1.0 - 0.037 * c, -2.1 * sn
+    if name in ("M2", "N2", "MS4"):
+        return f_m2, u_m2
+    if name in ("M4", "MN4"):
+        return f_m2 ** 2, 2 * u_m2
+    if name == "K1":
+        return 1.006 + 0.115 * c, -8.9 * sn
+    if name == "O1":
+        return 1.009 + 0.187 * c, 10.8 * sn
+    if name == "K2":
+        return 1.024 + 0.286 * c, -17.7 * sn
+    return 1.0, 0.0
+
+
+def _speeds():
+    """
+    Hoeksnelheid (graden/uur) per constituent, uit de Doodson-getallen.
+    """
+    rates = (15.0 + 0.98564736 / 24 - 13.17639648 / 24, 13.17639648 / 24, 0.98564736 / 24,
+             0.11140353 / 24, 0.05295377 / 24, 0.00004708 / 24)
+    return {name: sum(k * r for k, r in zip(nums, rates)) for name, (nums, _) in _DOODSON.items()}
+
+
+def predict_series(station, start_utc, step_min, count):
+    """
+    Harmonische som op een regelmatig rooster (alleen voor het voorrekenen).
+    Fase-argumenten worden één keer op start_utc bepaald en daarna lineair
+    doorgeschoven; knoopfactoren gelden voor het midden van de periode.
+    """
+    mid = start_utc + dt.timedelta(minutes=step_min * count / 2)
+    args0 = _astro_args(start_utc)
+    n_mid = -_astro_args(mid)[4]
+    speeds = _speeds()
+
+    terms = []
+    for name, (amp, g) in station["constituents"].items():
+        nums, extra = _DOODSON[name]
+        v0 = sum(k * a for k, a in zip(nums, args0)) + extra
+        f, u = _nodal(name, n_mid)
+        phase0 = math.radians(v0 + u - g)
+        dphi = math.radians(speeds[name] * step_min / 60.0)
+        terms.append((f * amp, phase0, dphi))
+
+    z0 = station.get("z0", 0.0)
+    out = array.array("d", bytes(8 * count))
+    cos = math.cos
+    for i in range(count):
+        out[i] = z0 + sum(a * cos(p0 + i * dp) for a, p0, dp in terms)
+    return out
+
+
+def _phases(levels):
+    """
+    Getijfase per sample: 0 = laagwater, 0.5 = hoogwater, richting 1 = weer laagwater.
+    Opkomend (LW -> HW) loopt lineair van 0 naar 0.5, afgaand van 0.5 naar 1.
+    """
+    n = len(levels)
+    extremes = []  # (index, is_hoogwater)
+    for i in range(1, n - 1):
+        a, b, c = levels[i - 1], levels[i], levels[i + 1]
+        if b > a and b >= c:
+            extremes.append((i, True))
+        elif b < a and b <= c:
+            extremes.append((i, False))
+
+    out = array.array("B", bytes(n))
+    if len(extremes) < 2:
+        return out
+
+    def fill(i0, i1, lo, hi):
+        span = max(i1 - i0, 1)
+        for i in range(max(i0, 0), min(i1, n)):
+            frac = (lo + (hi - lo) * (i - i0) / span) % 1.0
+            out[i] = min(int(frac * 256), 255)
+
+    for (i0, hw0), (i1, _) in zip(extremes, extremes[1:]):
+        if hw0:
+            fill(i0, i1, 0.5, 1.0)
+        else:
+            fill(i0, i1, 0.0, 0.5)
+
+    # randen: extrapoleer met de duur van het eerste/laatste segment
+    (f0, hw_first), (f1, _) = extremes[0], extremes[1]
+    if hw_first:
+        fill(f0 - (f1 - f0), f0, 0.0, 0.5)
+    else:
+        fill(f0 - (f1 - f0), f0, 0.5, 1.0)
+    (l0, _), (l1, hw_last) = extremes[-2], extremes[-1]
+    if hw_last:
+        fill(l1, l1 + (l1 - l0), 0.5, 1.0)
+    else:
+        fill(l1, l1 + (l1 - l0), 0.0, 0.5)
+    return out
+
+
+# =======================
+# Jaartabellen (binair gecachet)
+# =======================
+def _station_key(name):
+    import hashlib
+
+    blob = repr(sorted(STATIONS[name]["constituents"].items())) + repr(STATIONS[name].get("z0"))
+    return hashlib.sha1(blob.encode()).hexdigest()[:8]
+
+
+def _table_path(name, year):
+    return os.path.join(CACHE_DIR, f"tide_{name}_{year}_{_station_key(name)}.bin")
+
+
+def _year_start(year):
+    return dt.datetime(year, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def build_year_table(name, year):
+    """
+    Reken het hele jaar (+1 dag marge) voor en schrijf het binaire bestand.
+    """
+    start = _year_start(year)
+    days = (_year_start(year + 1) - start).days + 1
+    count = days * 24 * 60 // STEP_MIN
+
+    levels = predict_series(STATIONS[name], start, STEP_MIN, count)
+    cm = array.array("h", (int(round(v * 100)) for v in levels))
+    ph = _phases(levels)
+
+    path = _table_path(name, year)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, STEP_MIN, count))
+        cm.tofile(f)
+        ph.tofile(f)
+    os.replace(tmp, path)
+    return cm, ph
+
+
+def _load_year_table(name, year):
+    path = _table_path(name, year)
+    try:
+        with open(path, "rb") as f:
+            magic, version, step, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION or step != STEP_MIN:
+                return None
+            cm = array.array("h")
+            cm.fromfile(f, count)
+            ph = array.array("B")
+            ph.fromfile(f, count)
+            return cm, ph
+    except (OSError, EOFError, struct.error):
+        return None
+
+
+def year_table(name, year):
+    key = (name, year)
+    if key not in _TABLES:
+        _TABLES[key] = _load_year_table(name, year) or build_year_table(name, year)
+    return _TABLES[key]
+
+
+# =======================
+# Opvragen
+# =======================
+def tide_at(when_utc, name="scheveningen"):
+    """
+    (waterstand m t.o.v. NAP, fase 0..1) op een tz-aware tijdstip; O(1) index-read.
+    """
+    when_utc = when_utc.astimezone(dt.timezone.utc)
+    cm, ph = year_table(name, when_utc.year)
+    idx = int((when_utc - _year_start(when_utc.year)).total_seconds() // (STEP_MIN * 60))
+    return cm[idx] / 100.0, ph[idx] / 256.0
+
+
+def hourly_tide(times, tz_name, name="scheveningen"):
+    """
+    Getij voor Open-Meteo uurtijden ("YYYY-MM-DDTHH:MM", lokale tijd in tz_name).
+    Geeft per tijdstip (waterstand, fase) terug, of None als de tijd onleesbaar is.
+    """
+    try:
+        from zoneinfo import ZoneInfo  # type: ignore
+        tz = ZoneInfo(tz_name)
+    except Exception:
+        tz = dt.timezone.utc
+
+    out = []
+    for ts in times:
+        try:
+            local = dt.datetime.fromisoformat(ts).replace(tzinfo=tz)
+        except (TypeError, ValueError):
+            out.append(None)
+            continue
+        out.append(tide_at(local, name))
+    return out
+
+
+def phase_label(phase):
+    if phase is None:
+        return ""
+    if phase < 0.08 or phase >= 0.92:
+        return "laagwater"
+    if 0.42 <= phase < 0.58:
+        return "hoogwater"
+    return "opkomend" if phase < 0.5 else "afgaand"